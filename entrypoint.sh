@@ -16,5 +16,18 @@ python manage.py makemigrations income && \
 python manage.py makemigrations expenditure && \
 python manage.py makemigrations user 
 python manage.py migrate
+python manage.py createcachetable
+
+if [ "$DATABASE" = "postgres" ]
+then
+    python manage.py partition_ledger
+fi
+
+# Metric files of a previous run would be added to the new counts
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]
+then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
 
 exec "$@"
\ No newline at end of file
@@ -3,7 +3,29 @@ Register Model for Admin
 """
 from django.contrib import admin
 
-from .models import Expenditure
+from .models import Category, Expenditure
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    """
+    Categories are view only: CategoryManager caches name to id for good,
+    so a rename would file expenditures under the wrong name and a
+    delete is refused by the expenditures pointing at it.
+    """
+
+    list_display = ("name", "user")
+    list_select_related = ("user",)
+    search_fields = ("name",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 admin.site.register(Expenditure)
@@ -0,0 +1,139 @@
+"""
+Benchmarks for the User's Expenditure Endpoints
+"""
+from itertools import cycle, islice
+
+from rest_framework.renderers import JSONRenderer
+
+from expensetracker.benchmarking import benchmark
+from expensetracker.mixins import serialize_values, values_list_fields
+from expensetracker.renderers import MessagePackRenderer, ORJSONRenderer
+
+from .models import Category, Expenditure
+from .serializers import ExpenditureSerializer
+
+EXPENDITURE_URL = "/expenditure/user/"
+RENDERED_ROWS = 10_000
+SERIALIZED_ROWS = 500
+
+_rendered_lists = {}
+
+
+def latest_expense(context):
+    return {
+        "pk": Expenditure.objects.filter(user=context.user).latest("id").pk
+    }
+
+
+def new_expense(context):
+    category = Category.objects.ids_for(context.user.pk, ["transport"])
+    expense = Expenditure.objects.create(
+        user=context.user, category_id=category["transport"],
+        name_of_item="bus", estimated_amount=10,
+    )
+    return {"pk": expense.pk}
+
+
+def expense_list(context):
+    """The serialized expenditures of the user, repeated to 10k rows"""
+    key = (context.dataset, context.user.pk)
+    if key not in _rendered_lists:
+        rows = ExpenditureSerializer(
+            Expenditure.objects.filter(user=context.user)[:RENDERED_ROWS],
+            many=True,
+        ).data
+        _rendered_lists[key] = list(islice(cycle(rows), RENDERED_ROWS))
+    return {"data": _rendered_lists[key]}
+
+
+def second_page(context):
+    response = context.client.get(EXPENDITURE_URL)
+    return {"url": response.data["next"]}
+
+
+@benchmark("expenditure.list")
+def list_expenses(context):
+    return context.client.get(EXPENDITURE_URL)
+
+
+@benchmark("expenditure.list_next_page", setup=second_page)
+def list_next_page(context, url):
+    return context.client.get(url)
+
+
+@benchmark("expenditure.retrieve", setup=latest_expense)
+def retrieve_expense(context, pk):
+    return context.client.get(f"{EXPENDITURE_URL}{pk}/")
+
+
+@benchmark("expenditure.series")
+def expense_series(context):
+    return context.client.get(
+        f"{EXPENDITURE_URL}series/",
+        {"bucket": "month", "group_by": "category"},
+    )
+
+
+@benchmark("expenditure.create")
+def create_expense(context):
+    return context.client.post(EXPENDITURE_URL, {
+        "category": "transport", "name_of_item": "bus",
+        "estimated_amount": 100,
+    })
+
+
+@benchmark("expenditure.bulk_create")
+def bulk_create_expenses(context):
+    return context.client.post(f"{EXPENDITURE_URL}bulk/", [
+        {"category": "transport", "name_of_item": "bus",
+         "estimated_amount": 100}
+    ] * 50, format="json")
+
+
+@benchmark("expenditure.update", setup=latest_expense)
+def update_expense(context, pk):
+    return context.client.patch(
+        f"{EXPENDITURE_URL}{pk}/", {"estimated_amount": 120}
+    )
+
+
+@benchmark("expenditure.delete", setup=new_expense)
+def delete_expense(context, pk):
+    return context.client.delete(f"{EXPENDITURE_URL}{pk}/")
+
+
+@benchmark("expenditure.render_10k.json", setup=expense_list, iterations=20)
+def render_json(context, data):
+    JSONRenderer().render(data)
+
+
+@benchmark("expenditure.render_10k.orjson", setup=expense_list,
+           iterations=20)
+def render_orjson(context, data):
+    ORJSONRenderer().render(data)
+
+
+@benchmark("expenditure.render_10k.msgpack", setup=expense_list,
+           iterations=20)
+def render_msgpack(context, data):
+    MessagePackRenderer().render(data)
+
+
+@benchmark("expenditure.serialize_500.serializer", iterations=20)
+def serialize_instances(context):
+    ExpenditureSerializer(
+        Expenditure.objects.filter(user=context.user)
+        .select_related("category")[:SERIALIZED_ROWS],
+        many=True,
+    ).data
+
+
+@benchmark("expenditure.serialize_500.values_list", iterations=20)
+def serialize_values_list(context):
+    fields = values_list_fields(ExpenditureSerializer)
+    serialize_values(
+        Expenditure.objects.filter(user=context.user).values_list(
+            *[column for _, column, _ in fields]
+        )[:SERIALIZED_ROWS],
+        fields,
+    )
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.4 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenditure", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="expenditure",
+            index=models.Index(
+                fields=["user", "date_created", "id"],
+                name="expenditure_user_created_idx",
+            ),
+        ),
+    ]
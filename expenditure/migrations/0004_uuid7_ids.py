@@ -0,0 +1,32 @@
+# Generated by Django 4.1.4 on 2026-10-18 12:32
+
+from django.db import migrations, models
+import expensetracker.uuids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenditure", "0003_user_modified_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="expenditure",
+            name="id",
+            field=models.UUIDField(
+                db_index=True,
+                default=expensetracker.uuids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="expenditure",
+            index=models.Index(
+                fields=["user", "id"], name="expenditure_user_id_idx"
+            ),
+        ),
+    ]
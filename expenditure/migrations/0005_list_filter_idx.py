@@ -0,0 +1,27 @@
+# Generated by Django 4.1.4 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenditure", "0004_uuid7_ids"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="expenditure",
+            index=models.Index(
+                fields=["user", "category", "date_created", "id"],
+                name="expenditure_user_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="expenditure",
+            index=models.Index(
+                fields=["user", "estimated_amount", "id"],
+                name="expenditure_user_amount_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.1.4 on 2026-10-18 16:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("expenditure", "0005_list_filter_idx"),
+        # Its trigram index on the category column goes with the column
+        ("ledger", "0004_trigram_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "categories",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.UniqueConstraint(
+                fields=("user", "name"),
+                name="expenditure_category_user_name_uniq",
+            ),
+        ),
+        # Nullable and unindexed, so adding it does not rewrite the table
+        migrations.AddField(
+            model_name="expenditure",
+            name="category_ref",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.RESTRICT,
+                to="expenditure.category",
+            ),
+        ),
+    ]
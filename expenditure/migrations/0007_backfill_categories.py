@@ -0,0 +1,59 @@
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 10_000
+
+
+def backfill(apps, schema_editor):
+    """
+    Point every expenditure at the category of its user with its name.
+
+    Runs outside a migration transaction and walks the table in primary
+    key order, one short transaction per batch, so writers only ever
+    wait for the batch they touch. Each batch creates the categories it
+    is missing first, rows the old code writes meanwhile included: ids
+    are UUIDv7, so those rows come after the walk and are reached too.
+    """
+    Category = apps.get_model("expenditure", "Category")
+    Expenditure = apps.get_model("expenditure", "Expenditure")
+
+    category = Category.objects.filter(
+        user_id=OuterRef("user_id"), name=OuterRef("category")
+    ).values("id")[:1]
+    rows = Expenditure.objects.order_by("id").values_list(
+        "id", "user_id", "category", "category_ref_id"
+    )
+    last_id = None
+    while True:
+        with transaction.atomic():
+            batch = rows if last_id is None else rows.filter(id__gt=last_id)
+            batch = list(batch[:BATCH_SIZE])
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            pending = [row for row in batch if row[3] is None]
+            if not pending:
+                continue
+            Category.objects.bulk_create(
+                [
+                    Category(user_id=user_id, name=name)
+                    for user_id, name in {row[1:3] for row in pending}
+                ],
+                ignore_conflicts=True,
+            )
+            ids = [row[0] for row in pending]
+            Expenditure.objects.filter(id__in=ids).update(
+                category_ref=Subquery(category)
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("expenditure", "0006_category"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,157 @@
+from importlib import import_module
+
+from django.contrib.postgres import operations
+from django.db import migrations, models
+import django.db.models.deletion
+
+TABLE = "expenditure_expenditure"
+CHECK = "expenditure_category_ref_not_null"
+
+backfill = import_module(
+    "expenditure.migrations.0007_backfill_categories"
+).backfill
+
+
+def backfill_and_check(apps, schema_editor):
+    """
+    Point the rows written since 0007 at their category, then make sure
+    none is left behind: a NOT VALID check refuses new rows without a
+    category from now on, a second pass picks up the rows written in
+    between and VALIDATE scans the table without blocking writes.
+    """
+    backfill(apps, schema_editor)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {CHECK} "
+        f"CHECK (category_ref_id IS NOT NULL) NOT VALID"
+    )
+    backfill(apps, schema_editor)
+    schema_editor.execute(f"ALTER TABLE {TABLE} VALIDATE CONSTRAINT {CHECK}")
+
+
+def drop_check(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {CHECK}"
+        )
+
+
+class AddIndexConcurrently(operations.AddIndexConcurrently):
+    """CREATE INDEX CONCURRENTLY on PostgreSQL, a plain AddIndex elsewhere"""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_forwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.AddIndex.database_backwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+
+class RemoveIndexConcurrently(operations.RemoveIndexConcurrently):
+    """DROP INDEX CONCURRENTLY on PostgreSQL, a plain RemoveIndex elsewhere"""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.RemoveIndex.database_forwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        return migrations.RemoveIndex.database_backwards(
+            self, app_label, schema_editor, from_state, to_state
+        )
+
+
+class SetNotNull(migrations.AlterField):
+    """
+    AlterField making the foreign key required. On PostgreSQL it only
+    runs SET NOT NULL, which the validated check spares the table scan;
+    AlterField would also drop and re-add, and so re-validate, the
+    foreign key constraint.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        schema_editor.execute(
+            f"ALTER TABLE {TABLE} ALTER COLUMN category_id SET NOT NULL"
+        )
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT {CHECK}")
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        schema_editor.execute(
+            f"ALTER TABLE {TABLE} ALTER COLUMN category_id DROP NOT NULL"
+        )
+
+
+class Migration(migrations.Migration):
+    # Every step is short or does not block writes, none waits for another
+    atomic = False
+
+    dependencies = [
+        ("expenditure", "0007_backfill_categories"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_and_check, drop_check),
+        RemoveIndexConcurrently(
+            model_name="expenditure",
+            name="expenditure_user_category_idx",
+        ),
+        migrations.RemoveField(
+            model_name="expenditure",
+            name="category",
+        ),
+        migrations.RenameField(
+            model_name="expenditure",
+            old_name="category_ref",
+            new_name="category",
+        ),
+        SetNotNull(
+            model_name="expenditure",
+            name="category",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.RESTRICT,
+                to="expenditure.category",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="expenditure",
+            index=models.Index(
+                fields=["user", "category", "date_created", "id"],
+                name="expenditure_user_category_idx",
+            ),
+        ),
+    ]
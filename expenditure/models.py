@@ -1,25 +1,121 @@
 """
 Models for Expenditure
 """
-from uuid import uuid4
+from django.db import models, router, transaction
 
-from django.db import models
+from expensetracker.uuids import uuid7
 from user.models import User
 
 
+class CategoryManager(models.Manager):
+    """
+    Resolve category names to ids through a per process cache. Entries
+    are added once the categories are committed and stay valid as long
+    as categories are not deleted, which only happens with their user.
+    """
+    cache_size = 100_000
+    _ids = {}
+
+    def ids_for(self, user_id, names, create=True):
+        """
+        Ids of the categories ``names`` of the user by name, creating the
+        missing ones unless ``create`` is false
+        """
+        # One lookup per name: remember() may clear the cache from another
+        # thread between a membership test and a read
+        cached = {name: self._ids.get((user_id, name)) for name in names}
+        ids = {name: pk for name, pk in cached.items() if pk is not None}
+        missing = set(names) - set(ids)
+        if not missing:
+            return ids
+        using = router.db_for_write(self.model)
+        if create:
+            self.using(using).bulk_create(
+                [self.model(user_id=user_id, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+        found = dict(
+            self.using(using).filter(user_id=user_id, name__in=missing)
+            .values_list("name", "id")
+        )
+        ids.update(found)
+        transaction.on_commit(
+            lambda: self.remember(user_id, found), using=using
+        )
+        return ids
+
+    def remember(self, user_id, ids):
+        if len(self._ids) + len(ids) > self.cache_size:
+            self._ids.clear()
+        for name, pk in ids.items():
+            self._ids[user_id, name] = pk
+
+
+class Category(models.Model):
+    """Expenditure category of a user, referenced by a 4 byte key"""
+    id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=255)
+
+    objects = CategoryManager()
+
+    class Meta:
+        verbose_name_plural = "categories"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"],
+                name="expenditure_category_user_name_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+
 class Expenditure(models.Model):
     id = models.UUIDField(
         primary_key=True,
         unique=True, db_index=True,
-        default=uuid4, editable=False
+        default=uuid7, editable=False
     )
     date_created = models.DateTimeField(auto_now_add=True)
     date_modified = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    category = models.CharField(max_length=255)
+    category = models.ForeignKey(
+        Category, on_delete=models.RESTRICT, db_index=False
+    )
     name_of_item = models.CharField(max_length=255)
     estimated_amount = models.PositiveBigIntegerField()
 
+    class Meta:
+        indexes = [
+            # Serves the keyset pagination of the list endpoint
+            models.Index(
+                fields=["user", "date_created", "id"],
+                name="expenditure_user_created_idx",
+            ),
+            # Keyset pagination ordered by the time ordered primary key
+            models.Index(
+                fields=["user", "id"],
+                name="expenditure_user_id_idx",
+            ),
+            # Latest modification time for the list ETag
+            models.Index(
+                fields=["user", "date_modified"],
+                name="expenditure_user_modified_idx",
+            ),
+            # Category filters of the list, optionally by creation time
+            models.Index(
+                fields=["user", "category", "date_created", "id"],
+                name="expenditure_user_category_idx",
+            ),
+            # Amount ranges and amount ordering of the list
+            models.Index(
+                fields=["user", "estimated_amount", "id"],
+                name="expenditure_user_amount_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.name_of_item
 
@@ -0,0 +1,13 @@
+"""
+Pagination of the User's Expenditure list
+"""
+from expensetracker.pagination import KeysetPagination
+
+
+class ExpenditurePagination(KeysetPagination):
+    """KeysetPagination that can also sort by the estimated amount"""
+    orderings = {
+        **KeysetPagination.orderings,
+        "-estimated_amount": ("-estimated_amount", "-id"),
+        "estimated_amount": ("estimated_amount", "id"),
+    }
@@ -2,11 +2,57 @@
 Serializers for Expenditure
 """
 from rest_framework import serializers
-from .models import Expenditure
 
+from expensetracker.timing import TimedListSerializer, TimedSerializerMixin
 
-class ExpenditureSerializer(serializers.ModelSerializer):
+from .models import Category, Expenditure
+
+
+def resolve_categories(user_id, items):
+    """Replace the category names of ``items`` by the user's categories"""
+    ids = Category.objects.ids_for(
+        user_id, {item["category"] for item in items if "category" in item}
+    )
+    for item in items:
+        if "category" in item:
+            name = item["category"]
+            item["category"] = Category(id=ids[name], user_id=user_id,
+                                        name=name)
+    return items
+
+
+class CategoryField(serializers.CharField):
+    """
+    The name of the expenditure's category. Validated data keeps the
+    name, the serializers swap it for the category when saving.
+    """
+    # Read by ValuesListMixin in place of a column of the model
+    values_list_column = "category__name"
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_length", 255)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return instance.category.name
+
+
+class ExpenditureListSerializer(TimedListSerializer):
+    """Create a batch of expenditures with a single multi-row INSERT"""
+
+    def create(self, validated_data):
+        if validated_data:
+            resolve_categories(validated_data[0]["user"].pk, validated_data)
+        return Expenditure.objects.bulk_create(
+            [Expenditure(**item) for item in validated_data]
+        )
+
+
+class ExpenditureSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     """Serializer for Expenditure Model"""
+    category = CategoryField()
 
     class Meta:
         model = Expenditure
@@ -14,3 +60,12 @@ class ExpenditureSerializer(serializers.ModelSerializer):
             "id", "category", "name_of_item", "estimated_amount"
         ]
         read_only_fields = ["id"]
+        list_serializer_class = ExpenditureListSerializer
+
+    def create(self, validated_data):
+        resolve_categories(validated_data["user"].pk, [validated_data])
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        resolve_categories(instance.user_id, [validated_data])
+        return super().update(instance, validated_data)
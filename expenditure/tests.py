@@ -1,11 +1,40 @@
 """
 Test cases for the User's Expenditure Endpoints
 """
-from django.test import TestCase
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+from uuid import UUID
+
+import msgpack
+
+from asgiref.sync import sync_to_async
+from django.contrib import admin
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.urls import include, path, resolve
 
+from rest_framework.routers import DefaultRouter
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from expenditure.models import Category, Expenditure
+from expenditure.pagination import ExpenditurePagination
+from expenditure.views import AsyncExpenditureAPIView
+
+
+async_router = DefaultRouter()
+async_router.register("user", AsyncExpenditureAPIView)
+
+# Serves the async viewset whatever API_MODE the suite runs with
+urlpatterns = [
+    path("expenditure/", include((async_router.urls, "expenditure"))),
+    path("ledger/", include("ledger.urls")),
+]
 
 
 def create_user(**params):
@@ -76,7 +105,7 @@ class ExpenditureAPITests(TestCase):
         }
         self.client.post("/expenditure/user/", payload)
         response = self.client.get("/expenditure/user/")
-        data_size = len(response.data)
+        data_size = len(response.data["results"])
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data_size, 1)
@@ -102,7 +131,7 @@ class ExpenditureAPITests(TestCase):
 
         response = self.client.get("/expenditure/user/")
 
-        data_size = len(response.data)
+        data_size = len(response.data["results"])
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data_size, 0)
 
@@ -242,5 +271,738 @@ class ExpenditureAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(response2.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_list_expense_is_paginated(self):
+        """Walk every page of the expenditure list with the cursor"""
+
+        for amount in range(5):
+            self.client.post("/expenditure/user/", {
+                "category": "transport",
+                "name_of_item": "transport",
+                "estimated_amount": amount
+            })
+
+        seen = []
+        url = "/expenditure/user/?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen.extend(
+                item["estimated_amount"] for item in response.data["results"]
+            )
+            url = response.data["next"]
+
+        # Newest first, every row exactly once
+        self.assertEqual(seen, [4, 3, 2, 1, 0])
+
+    def test_list_expense_ordered_by_id(self):
+        """Time ordered ids can be used as the pagination key"""
+
+        for amount in range(5):
+            self.client.post("/expenditure/user/", {
+                "category": "transport",
+                "name_of_item": "transport",
+                "estimated_amount": amount
+            })
+
+        seen = []
+        url = "/expenditure/user/?page_size=2&ordering=id"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(response.data["results"])
+            url = response.data["next"]
+
+        # Oldest first, ids are UUIDv7
+        self.assertEqual(
+            [item["estimated_amount"] for item in seen], [0, 1, 2, 3, 4]
+        )
+        self.assertEqual({UUID(item["id"]).version for item in seen}, {7})
+
+    def test_list_expense_page_size_is_capped(self):
+        """A page never exceeds the maximum page size"""
+
+        for amount in range(4):
+            self.client.post("/expenditure/user/", {
+                "category": "transport",
+                "name_of_item": "transport",
+                "estimated_amount": amount
+            })
+
+        with mock.patch.object(ExpenditurePagination, "max_page_size", 3):
+            response = self.client.get("/expenditure/user/?page_size=100000")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_list_expense_does_not_count(self):
+        """Listing a page reads rows once and never runs a COUNT(*)"""
+
+        payload = {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": 50
+        }
+        self.client.post("/expenditure/user/", payload)
+        self.client.post("/expenditure/user/", payload)
+
+        first_page = self.client.get("/expenditure/user/?page_size=1")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first_page.data["next"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        page_queries = [
+            query for query in queries if "ORDER BY" in query["sql"]
+        ]
+        self.assertEqual(len(page_queries), 1)
+        for query in queries:
+            self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_list_expense_with_invalid_cursor(self):
+        """A tampered cursor is rejected"""
+
+        response = self.client.get("/expenditure/user/?cursor=garbage")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_add_expenditure_success(self):
+        """Add a batch of expenditures with a single INSERT"""
+
+        payload = [
+            {
+                "category": "transport",
+                "name_of_item": "bus",
+                "estimated_amount": amount
+            }
+            for amount in range(3)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/expenditure/user/bulk/", payload, format="json"
+            )
+        inserts = [
+            query for query in queries
+            if query["sql"].startswith(
+                'INSERT INTO "expenditure_expenditure"'
+            )
+        ]
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertIn("id", response.data[0])
+        self.assertEqual(len(inserts), 1)
+
+        response = self.client.get("/expenditure/user/")
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_bulk_add_expenditure_reports_item_index(self):
+        """Invalid items are reported with their index and nothing is saved"""
+
+        payload = [
+            {
+                "category": "transport",
+                "name_of_item": "bus",
+                "estimated_amount": 50
+            },
+            {
+                "category": "transport",
+                "name_of_item": "",
+                "estimated_amount": 50
+            },
+        ]
+        response = self.client.post(
+            "/expenditure/user/bulk/", payload, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data["errors"]), 1)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertIn("name_of_item", response.data["errors"][0]["errors"])
+
+        response = self.client.get("/expenditure/user/")
+        self.assertEqual(len(response.data["results"]), 0)
+
+    def test_bulk_add_expenditure_with_object(self):
+        """The batch endpoint only accepts a list"""
+
+        payload = {
+            "category": "transport",
+            "name_of_item": "bus",
+            "estimated_amount": 50
+        }
+        response = self.client.post(
+            "/expenditure/user/bulk/", payload, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_expenditure_by_ids(self):
+        """Re-categorise a batch of expenditures by id"""
+
+        created = self.client.post("/expenditure/user/bulk/", [
+            {
+                "category": "transport",
+                "name_of_item": "bus",
+                "estimated_amount": 50
+            }
+            for _ in range(2)
+        ], format="json")
+        ids = [item["id"] for item in created.data]
+        missing = "00000000-0000-0000-0000-000000000000"
+
+        response = self.client.patch("/expenditure/user/bulk/", {
+            "ids": ids + [missing],
+            "changes": {"category": "travel"}
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        outcomes = {
+            str(item["id"]): item["status"]
+            for item in response.data["results"]
+        }
+        self.assertEqual(outcomes[ids[0]], "updated")
+        self.assertEqual(outcomes[ids[1]], "updated")
+        self.assertEqual(outcomes[missing], "not_found")
+
+        response = self.client.get("/expenditure/user/")
+        self.assertEqual(
+            {item["category"] for item in response.data["results"]},
+            {"travel"}
+        )
+
+    def test_bulk_update_expenditure_with_invalid_changes(self):
+        """Changes are validated like a partial update"""
+
+        response = self.client.patch("/expenditure/user/bulk/", {
+            "filter": {"category": "transport"},
+            "changes": {"estimated_amount": "lots"}
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("changes", response.data)
+
+    def test_bulk_delete_expenditure_by_filter(self):
+        """Purge every expenditure of a category"""
+
+        self.client.post("/expenditure/user/bulk/", [
+            {
+                "category": category,
+                "name_of_item": "item",
+                "estimated_amount": 50
+            }
+            for category in ["transport", "transport", "food"]
+        ], format="json")
+
+        response = self.client.delete("/expenditure/user/bulk/", {
+            "filter": {"category": "transport"}
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get("/expenditure/user/")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["category"], "food")
+
+    def test_bulk_delete_other_users_expenditure(self):
+        """Batch deletes never reach another user's records"""
+
+        client2 = APIClient()
+        client2.force_authenticate(create_user(
+            email="test2@example.com", password="testpas123"
+        ))
+        created = client2.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": 50
+        })
+
+        response = self.client.delete("/expenditure/user/bulk/", {
+            "ids": [created.data["id"]]
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["status"], "not_found")
+
+        response = client2.get("/expenditure/user/")
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def create_dated_expenses(self):
+        """Create expenses spread over a few months"""
+        for category, amount, created in [
+            ("food", 10, "2026-01-10T12:00:00Z"),
+            ("transport", 20, "2026-01-31T23:30:00Z"),
+            ("food", 30, "2026-03-05T08:00:00Z"),
+        ]:
+            response = self.client.post("/expenditure/user/", {
+                "category": category,
+                "name_of_item": "item",
+                "estimated_amount": amount
+            })
+            Expenditure.objects.filter(pk=response.data["id"]).update(
+                date_created=created
+            )
+
+    def test_expense_series_by_month(self):
+        """Monthly totals are computed per bucket"""
+
+        self.create_dated_expenses()
+        response = self.client.get("/expenditure/user/series/?bucket=month")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (str(row["period"]), row["total"], row["count"])
+                for row in response.data["results"]
+            ],
+            [("2026-01-01", 30, 2), ("2026-03-01", 30, 1)]
+        )
+
+    def test_expense_series_in_time_zone(self):
+        """Buckets follow the requested time zone"""
+
+        self.create_dated_expenses()
+        response = self.client.get(
+            "/expenditure/user/series/?bucket=month&tz=Europe/Berlin"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (str(row["period"]), row["total"])
+                for row in response.data["results"]
+            ],
+            [("2026-01-01", 10), ("2026-02-01", 20), ("2026-03-01", 30)]
+        )
+
+    def test_expense_series_by_category_and_range(self):
+        """Totals can be grouped by category within a date range"""
+
+        self.create_dated_expenses()
+        response = self.client.get(
+            "/expenditure/user/series/?bucket=day&group_by=category"
+            "&start=2026-01-01&end=2026-01-31"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (str(row["period"]), row["category"], row["total"])
+                for row in response.data["results"]
+            ],
+            [("2026-01-10", "food", 10), ("2026-01-31", "transport", 20)]
+        )
+
+    def test_expense_series_with_unknown_time_zone(self):
+        """An unknown time zone is rejected"""
+
+        response = self.client.get("/expenditure/user/series/?tz=Mars/Base")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_expense_not_modified(self):
+        """A matching If-None-Match is answered without loading rows"""
+
+        self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": 50
+        })
+        response = self.client.get("/expenditure/user/")
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(
+                "/expenditure/user/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        for query in queries:
+            self.assertNotIn("name_of_item", query["sql"])
+
+    def test_list_expense_etag_changes_after_write(self):
+        """A write invalidates the list ETag"""
+
+        response = self.client.get("/expenditure/user/")
+        self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": 50
+        })
+
+        response = self.client.get(
+            "/expenditure/user/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_list_expense_etag_changes_after_delete_and_update(self):
+        """Deletes and updates invalidate the list as well"""
+
+        ids = [
+            self.client.post("/expenditure/user/", {
+                "category": "transport",
+                "name_of_item": "transport",
+                "estimated_amount": amount
+            }).data["id"]
+            for amount in (50, 60)
+        ]
+        etag = self.client.get("/expenditure/user/")["ETag"]
+
+        self.client.delete(f"/expenditure/user/{ids[0]}/")
+        response = self.client.get(
+            "/expenditure/user/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        self.client.patch(
+            f"/expenditure/user/{ids[1]}/", {"estimated_amount": 70}
+        )
+        response = self.client.get(
+            "/expenditure/user/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["estimated_amount"], 70)
+
+    def test_get_expense_not_modified_since(self):
+        """If-Modified-Since on an unchanged item returns 304"""
+
+        created = self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": 50
+        })
+        url = "/expenditure/user/{}/".format(created.data["id"])
+        response = self.client.get(url)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_expense_with_stale_etag(self):
+        """If-Match protects newer data from stale writers"""
+
+        created = self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": 50
+        })
+        url = "/expenditure/user/{}/".format(created.data["id"])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.patch(
+            url, {"estimated_amount": 60}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.patch(
+            url, {"estimated_amount": 70}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        response = self.client.delete(url, HTTP_IF_MATCH=etag)
+        self.assertEqual(
+            response.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.assertEqual(self.client.get(url).data["estimated_amount"], 60)
+
+    def test_expense_in_messagepack(self):
+        """Expenditures are read and written in MessagePack on request"""
+
+        largest = 2 ** 63 - 1
+        response = self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "plane",
+            "estimated_amount": largest
+        }, format="msgpack")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(
+            "/expenditure/user/", HTTP_ACCEPT="application/msgpack"
+        )
+
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        expense = msgpack.unpackb(response.content)["results"][0]
+        self.assertEqual(expense["estimated_amount"], largest)
+        self.assertEqual(
+            expense["id"], str(response.data["results"][0]["id"])
+        )
+
+    def test_expense_big_amount_in_json(self):
+        """Amounts up to the largest big integer survive JSON"""
+
+        largest = 2 ** 63 - 1
+        response = self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "plane",
+            "estimated_amount": largest
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(
+            "/expenditure/user/{}/".format(response.data["id"])
+        )
+        self.assertEqual(
+            json.loads(response.content)["estimated_amount"], largest
+        )
+
+    def test_add_expense_with_malformed_body(self):
+        """Bodies that do not parse are refused"""
+
+        for body, content_type in [
+            (b"{\"category\":", "application/json"),
+            (b"\xc1", "application/msgpack"),
+        ]:
+            response = self.client.generic(
+                "POST", "/expenditure/user/", body, content_type
+            )
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_list_expense_filtered(self):
+        """Category, amount and creation time filters combine"""
+
+        for category, amount in [
+            ("transport", 50), ("transport", 150), ("food", 120),
+            ("rent", 900),
+        ]:
+            self.client.post("/expenditure/user/", {
+                "category": category,
+                "name_of_item": "item",
+                "estimated_amount": amount
+            })
+        created = Expenditure.objects.values_list("date_created", flat=True)
+
+        response = self.client.get("/expenditure/user/", {
+            "category": ["transport", "food"],
+            "estimated_amount_min": 100,
+            "created_after": min(created).isoformat(),
+            "created_before": (max(created) + timedelta(1)).isoformat(),
+            "ordering": "-estimated_amount",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["estimated_amount"] for item in response.data["results"]],
+            [150, 120],
+        )
+        response = self.client.get(
+            "/expenditure/user/", {"created_after": max(created).isoformat()}
+        )
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_list_expense_with_invalid_filters(self):
+        """Malformed or contradicting filters are refused"""
+
+        for params in [
+            {"estimated_amount_min": "many"},
+            {"estimated_amount_min": 10, "estimated_amount_max": 5},
+            {"created_after": "yesterday"},
+            {"created_after": "2023-02-01T00:00:00Z",
+             "created_before": "2023-01-01T00:00:00Z"},
+        ]:
+            response = self.client.get("/expenditure/user/", params)
+
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_expense_categories_are_rows_per_user(self):
+        """Each name is stored once per user and read back as the name"""
+
+        for category in ["transport", "transport", "food"]:
+            response = self.client.post("/expenditure/user/", {
+                "category": category,
+                "name_of_item": "item",
+                "estimated_amount": 10
+            })
+            self.assertEqual(response.data["category"], category)
+        other = APIClient()
+        other.force_authenticate(
+            create_user(email="test2@example.com", password="testpas123")
+        )
+        other.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "item",
+            "estimated_amount": 10
+        })
+
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(
+            Category.objects.filter(name="transport").count(), 2
+        )
+        response = self.client.get("/expenditure/user/")
+        self.assertEqual(
+            sorted(item["category"] for item in response.data["results"]),
+            ["food", "transport", "transport"],
+        )
+
+    def test_expense_category_ids_are_cached(self):
+        """Committed categories are resolved without a query"""
+
+        payload = {
+            "category": "cached",
+            "name_of_item": "item",
+            "estimated_amount": 10
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/expenditure/user/", payload)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/expenditure/user/", payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if "expenditure_category" in query["sql"]
+        ])
+
+    def test_expense_categories_are_view_only_in_admin(self):
+        """The admin can't rename or delete the cached categories"""
+
+        category_admin = admin.site._registry[Category]
+        request = RequestFactory().get("/admin/")
+        request.user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpasswd123"
+        )
+
+        self.assertTrue(category_admin.has_view_permission(request))
+        self.assertFalse(category_admin.has_add_permission(request))
+        self.assertFalse(category_admin.has_change_permission(request))
+        self.assertFalse(category_admin.has_delete_permission(request))
+
+    def test_bulk_filter_on_unknown_category(self):
+        """Filtering on a name nobody used matches nothing, creates nothing"""
+
+        self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "item",
+            "estimated_amount": 10
+        })
+
+        response = self.client.delete("/expenditure/user/bulk/", {
+            "filter": {"category": "unknown"}
+        }, format="json")
+
+        self.assertEqual(response.data["results"], [])
+        self.assertFalse(Category.objects.filter(name="unknown").exists())
+        self.assertEqual(Expenditure.objects.count(), 1)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncExpenditureAPITests(TestCase):
+    """Async Expenditure API Tests"""
+
+    def setUp(self):
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            "category": "transport",
+            "name_of_item": "bus",
+            "estimated_amount": 50
+        }
+
+    def test_view_is_a_coroutine(self):
+        """Django awaits the async viewset instead of wrapping it"""
+
+        match = resolve("/expenditure/user/")
+
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
+        self.assertTrue(match.func.csrf_exempt)
+        self.assertEqual(match.func.actions["get"], "list")
+
+    def test_create_list_and_retrieve(self):
+        """Create, then read back through the async handlers"""
+
+        created = self.client.post("/expenditure/user/", self.payload)
+        listed = self.client.get("/expenditure/user/")
+        retrieved = self.client.get(
+            "/expenditure/user/{}/".format(created.data["id"])
+        )
+
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(listed.data["results"], [created.data])
+        self.assertEqual(retrieved.data, created.data)
+        self.assertEqual(
+            self.client.get("/ledger/balance/").data["expenditure_total"], 50
+        )
+
+    def test_list_is_paginated_and_conditional(self):
+        """Cursor pagination and ETags behave as in the sync view"""
+
+        for _ in range(3):
+            self.client.post("/expenditure/user/", self.payload)
+
+        first = self.client.get("/expenditure/user/?page_size=2")
+        second = self.client.get(first.data["next"])
+        not_modified = self.client.get(
+            "/expenditure/user/?page_size=2",
+            HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+
+        self.assertEqual(len(first.data["results"]), 2)
+        self.assertEqual(len(second.data["results"]), 1)
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_retrieve_other_users_expense(self):
+        """Records of another user are not found"""
+
+        other = APIClient()
+        other.force_authenticate(
+            create_user(email="test2@example.com", password="testpas123")
+        )
+        created = other.post("/expenditure/user/", self.payload)
+
+        response = self.client.get(
+            "/expenditure/user/{}/".format(created.data["id"])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sync_actions_still_work(self):
+        """Update and bulk actions run through the sync handlers"""
+
+        created = self.client.post("/expenditure/user/", self.payload)
+        url = "/expenditure/user/{}/".format(created.data["id"])
+
+        updated = self.client.patch(url, {"estimated_amount": 70})
+        bulk = self.client.delete(
+            "/expenditure/user/bulk/",
+            {"ids": [created.data["id"]]}, format="json"
+        )
+
+        self.assertEqual(updated.data["estimated_amount"], 70)
+        self.assertEqual(bulk.data["results"][0]["status"], "deleted")
+
+    async def test_jwt_request_over_async_client(self):
+        """A bearer token authenticates without a sync view in the way"""
+
+        refresh = await sync_to_async(RefreshToken.for_user)(self.user)
+        access = str(refresh.access_token)
+
+        response = await self.async_client.get(
+            "/expenditure/user/", AUTHORIZATION=f"Bearer {access}"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [])
+
 
 # Create your tests here.
@@ -1,15 +1,20 @@
 """
 URLs for Expenditure API
 """
+from django.conf import settings
 from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from .views import ExpenditureAPIView
+from .views import AsyncExpenditureAPIView, ExpenditureAPIView
 
 
 router = DefaultRouter()
-router.register("user", ExpenditureAPIView)
+router.register(
+    "user",
+    AsyncExpenditureAPIView if settings.API_MODE == "async"
+    else ExpenditureAPIView
+)
 
 app_name = "expenditure"
 
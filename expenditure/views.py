@@ -2,24 +2,82 @@
 Views for the user's Expenditure
 """
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 
-from .models import Expenditure
+from expensetracker.async_views import AsyncModelViewSetMixin
+from expensetracker.mixins import (
+    BulkCreateMixin, BulkUpdateDestroyMixin, ConditionalRequestMixin,
+    ListFilterMixin, ReplicaReadMixin, TimeSeriesMixin, UserScopedMixin,
+    ValuesListMixin
+)
+from ledger.mixins import ArchiveReadMixin, BalanceRollupMixin
 
-from .serializers import ExpenditureSerializer
+from .models import Category, Expenditure
+from .pagination import ExpenditurePagination
 
+from .serializers import ExpenditureSerializer, resolve_categories
 
-class ExpenditureAPIView(viewsets.ModelViewSet):
+
+class ExpenditureAPIView(
+    ReplicaReadMixin, ArchiveReadMixin, BalanceRollupMixin, UserScopedMixin,
+    ListFilterMixin, ConditionalRequestMixin, ValuesListMixin, BulkCreateMixin,
+    BulkUpdateDestroyMixin, TimeSeriesMixin, viewsets.ModelViewSet
+):
     """Operations about a user's expenditure"""
     serializer_class = ExpenditureSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Expenditure.objects.all()
+    pagination_class = ExpenditurePagination
+    queryset = Expenditure.objects.select_related("category")
+    amount_field = "estimated_amount"
+    rollup_kind = "expenditure"
+    series_group_fields = ["category"]
+    list_filter_fields = ["category"]
+    archive_filter_columns = {"category": "category__name"}
+
+    def get_list_filter(self, name, values):
+        if name != "category":
+            return super().get_list_filter(name, values)
+        # Compares the integer keys, a subquery keeps the event loop of
+        # the async list free of queries
+        return {"category__in": Category.objects.filter(
+            user=self.request.user, name__in=values
+        ).values("id")}
+
+    def validate_bulk_fields(self, data, key):
+        fields = super().validate_bulk_fields(data, key)
+        if "category" not in fields:
+            return fields
+        if key == "changes":
+            return resolve_categories(self.request.user.pk, [fields])[0]
+        # Filters never create categories, unknown names match nothing
+        name = fields.pop("category")
+        fields["category__in"] = list(Category.objects.ids_for(
+            self.request.user.pk, [name], create=False
+        ).values())
+        return fields
+
+    def label_series(self, rows, group):
+        if group == ["category"]:
+            names = dict(Category.objects.filter(
+                id__in={row["category"] for row in rows}
+            ).values_list("id", "name"))
+            for row in rows:
+                row["category"] = names[row["category"]]
+        return rows
+
+    @action(
+        detail=False, methods=["post", "patch", "delete"], url_path="bulk"
+    )
+    def bulk(self, request):
+        """Create, update or delete a batch of expenditures"""
+        if request.method == "POST":
+            return self.bulk_create(request)
+        return super().bulk(request)
+
 
-    def get_queryset(self):
-        """Override queryset to filter for user"""
-        return self.queryset.filter(user=self.request.user)
+class AsyncExpenditureAPIView(AsyncModelViewSetMixin, ExpenditureAPIView):
+    """ExpenditureAPIView with async reads, served when API_MODE is async"""
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
 
 # Create your views here.
@@ -0,0 +1,225 @@
+"""
+Coroutine versions of the ledger viewsets for ASGI deployments
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import get_conditional_response
+
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+
+from expensetracker.db.routers import is_pinned_to_primary
+
+
+class DatabaseExecutor:
+    """
+    Bounded thread pool for ORM work started from coroutines.
+
+    Django gives every ASGI request its own thread for sync code, and the
+    async ORM methods (``aget``, ``acreate``, ...) run there too, so 1000
+    concurrent requests mean 1000 threads and 1000 database connections.
+    With ``ASYNC_DB_THREADS`` set, ORM calls of all requests share that
+    many threads instead and each thread keeps its connection open.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.ASYNC_DB_THREADS,
+                    thread_name_prefix="async-db",
+                )
+            return self._executor
+
+    def wrap(self, func):
+        """Return an awaitable version of the sync callable ``func``"""
+        if not settings.ASYNC_DB_THREADS:
+            # Same as Django's async ORM methods
+            return sync_to_async(func)
+
+        def call(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.drop_broken_connections()
+
+        return sync_to_async(
+            call, thread_sensitive=False, executor=self.get_executor()
+        )
+
+    def drop_broken_connections(self):
+        """Close this thread's connections that failed and are unusable"""
+        for connection in connections.all(initialized_only=True):
+            if (
+                connection.connection is not None
+                and connection.errors_occurred
+            ):
+                if connection.is_usable():
+                    connection.errors_occurred = False
+                else:
+                    connection.close()
+
+
+database_executor = DatabaseExecutor()
+database_sync_to_async = database_executor.wrap
+
+
+class AsyncAPIViewMixin:
+    """
+    Dispatch a DRF view as a coroutine.
+
+    Authenticators providing ``aauthenticate`` and handlers defined with
+    ``async def`` run on the event loop. Any other authenticator or
+    handler runs through ``database_sync_to_async``, so sync actions keep
+    working unchanged.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        sync_view = super().as_view(*args, **kwargs)
+
+        # A coroutine function, so Django's handler awaits the view instead
+        # of running it in a thread
+        async def view(*args, **kwargs):
+            return await sync_view(*args, **kwargs)
+
+        update_wrapper(view, sync_view)
+        # Set directly: the csrf_exempt decorator of Django 4.1 would wrap
+        # the coroutine function in a plain function again
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            if settings.DATABASE_REPLICAS:
+                # Look the primary pin up off the event loop, its cache
+                # may be a database table
+                await database_sync_to_async(is_pinned_to_primary)(request)
+            self.initial(request, *args, **kwargs)
+
+            method = request.method.lower()
+            handler = self.http_method_not_allowed
+            if method in self.http_method_names:
+                handler = getattr(self, method, handler)
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await database_sync_to_async(handler)(
+                    request, *args, **kwargs
+                )
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def aperform_authentication(self, request):
+        """``Request._authenticate`` without blocking the event loop"""
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth = await authenticator.aauthenticate(request)
+                else:
+                    user_auth = await database_sync_to_async(
+                        authenticator.authenticate
+                    )(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+        request._not_authenticated()
+
+
+class AsyncModelViewSetMixin(AsyncAPIViewMixin):
+    """
+    Async list, retrieve and create for the user scoped ledger viewsets.
+
+    Parsing, validation, serialization and the conditional request checks
+    run on the event loop; only the queries leave it, one hop each.
+    Update, delete and the extra actions are the sync handlers of the
+    viewset, run whole in the database executor.
+    """
+
+    async def list(self, request, *args, **kwargs):
+        state = await database_sync_to_async(self.get_list_state)()
+        validators = self.get_list_validators(request, state)
+        return await self.aconditional(
+            validators, self.alist_rows, request, *args, **kwargs
+        )
+
+    async def alist_rows(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = getattr(self, "get_values_list_fields", lambda: None)()
+        if fields is not None:
+            rows = await database_sync_to_async(self.fetch_values_list)(
+                queryset, fields
+            )
+            return self.get_values_list_response(rows, fields)
+        if self.paginator is None:
+            rows = await database_sync_to_async(list)(queryset)
+            return Response(self.get_serializer(rows, many=True).data)
+        rows = await database_sync_to_async(self.paginator.paginate_queryset)(
+            queryset, request, view=self
+        )
+        serializer = self.get_serializer(rows, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        validators = await database_sync_to_async(
+            self.get_object_validators
+        )()
+        return await self.aconditional(
+            validators, self.aretrieve_row, request, *args, **kwargs
+        )
+
+    async def aretrieve_row(self, request, *args, **kwargs):
+        instance = await database_sync_to_async(self.get_object)()
+        return Response(self.get_serializer(instance).data)
+
+    async def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Saves the row and its balance rollup in one transaction
+        await database_sync_to_async(self.perform_create)(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+    async def aconditional(self, validators, handler, request, *args,
+                           **kwargs):
+        """``conditional`` for a coroutine ``handler``"""
+        if validators is None:
+            return await handler(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            self.set_validators(response, validators)
+        return response
@@ -0,0 +1,215 @@
+"""
+Endpoint benchmarks against seeded datasets, see the benchmarks modules
+"""
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import autodiscover_modules
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ledger.seed import seed_email, seed_email_domain, user_row_counts
+
+# name: (users, income and expenditure rows, seed)
+DATASETS = {
+    "small": (10, 1_000, 1),
+    "medium": (100, 100_000, 2),
+    "large": (1_000, 1_000_000, 3),
+}
+
+SEED_PASSWORD = "seedpassword123"
+
+# Metrics compared against the baseline; lower is better for all
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "queries",
+                    "peak_memory_kb")
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable
+    setup: Optional[Callable] = None
+    iterations: Optional[int] = None
+
+
+registry = {}
+
+
+def benchmark(name, setup=None, iterations=None):
+    """
+    Register ``func(context, **kwargs)`` as the benchmark ``name``.
+
+    ``func`` makes one request with ``context.client`` and returns the
+    response, or returns nothing when it times code below the views.
+    ``setup(context)`` runs untimed before every request and returns the
+    keyword arguments for ``func``, e.g. a fresh row to delete.
+    ``iterations`` caps the timed requests for slow endpoints.
+    """
+    def register(func):
+        registry[name] = Benchmark(name, func, setup, iterations)
+        return func
+    return register
+
+
+def discover():
+    """Import the benchmarks module of every installed app"""
+    autodiscover_modules("benchmarks")
+    return registry
+
+
+@dataclass
+class BenchmarkContext:
+    """The dataset and the seeded user a benchmark runs as"""
+    dataset: str
+    user: object
+    password: str = SEED_PASSWORD
+    client: APIClient = field(default_factory=APIClient)
+    _unique: count = field(default_factory=count)
+
+    def __post_init__(self):
+        token = RefreshToken.for_user(self.user)
+        self.refresh_token = str(token)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+        )
+
+    def unique(self, prefix):
+        """A value no earlier call of this run returned"""
+        return f"{prefix}{next(self._unique)}"
+
+
+def dataset_context(name):
+    """
+    Context for the dataset ``name``: the user with the most rows, the
+    worst case for the list and summary endpoints.
+    """
+    users, rows, seed = DATASETS[name]
+    counts = user_row_counts(seed, users, rows)
+    index = counts.index(max(counts))
+    user = get_user_model().objects.get(email=seed_email(seed, index))
+    return BenchmarkContext(name, user)
+
+
+def seeded(name):
+    _, _, seed = DATASETS[name]
+    return get_user_model().objects.filter(
+        email__endswith=seed_email_domain(seed)
+    ).exists()
+
+
+def percentile(values, percent):
+    """Nearest rank percentile of the sorted ``values``"""
+    rank = max(1, round(percent / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def prepare(bench, context):
+    return bench.setup(context) if bench.setup else {}
+
+
+def call(bench, context, kwargs):
+    started = time.perf_counter()
+    response = bench.func(context, **kwargs)
+    elapsed = time.perf_counter() - started
+    if response is not None and response.status_code >= 400:
+        raise RuntimeError(
+            f"{bench.name} failed with {response.status_code}: "
+            f"{getattr(response, 'data', response.content)!r}"
+        )
+    return elapsed
+
+
+def run_benchmark(bench, context, iterations=50, warmup=5):
+    """
+    Time ``iterations`` requests after ``warmup`` ones, then repeat a few
+    under tracemalloc and query capture, which would skew the timings.
+    Rows the requests write are rolled back afterwards.
+    """
+    if bench.iterations:
+        iterations = min(iterations, bench.iterations)
+        warmup = min(warmup, bench.iterations)
+    iterations = max(iterations, 1)
+    queries = peak = 0
+    with transaction.atomic():
+        for _ in range(warmup):
+            call(bench, context, prepare(bench, context))
+        timings = sorted(
+            1000 * call(bench, context, prepare(bench, context))
+            for _ in range(iterations)
+        )
+
+        tracemalloc.start()
+        try:
+            for _ in range(min(iterations, 3)):
+                kwargs = prepare(bench, context)
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                with CaptureQueriesContext(connection) as captured:
+                    call(bench, context, kwargs)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+                queries = max(queries, sum(
+                    # Savepoints only come from the surrounding transaction
+                    "SAVEPOINT" not in query["sql"] for query in captured
+                ))
+        finally:
+            tracemalloc.stop()
+        transaction.set_rollback(True)
+
+    return {
+        "benchmark": bench.name,
+        "dataset": context.dataset,
+        "iterations": len(timings),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": queries,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold, noise_ms=1.0):
+    """
+    Regressions of ``results`` against ``baseline`` (both result lists):
+    metrics more than ``threshold`` percent above the baseline value, for
+    latencies also more than ``noise_ms`` above it. Query counts must not
+    grow at all.
+    """
+    previous = {
+        (result["benchmark"], result["dataset"]): result
+        for result in baseline
+    }
+    regressions = []
+    for result in results:
+        before = previous.get((result["benchmark"], result["dataset"]))
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in before:
+                continue
+            if metric == "queries":
+                allowed = before[metric]
+            else:
+                allowed = before[metric] * (1 + threshold / 100)
+                if metric.endswith("_ms"):
+                    allowed = max(allowed, before[metric] + noise_ms)
+            if result[metric] > allowed:
+                regressions.append({
+                    "benchmark": result["benchmark"],
+                    "dataset": result["dataset"],
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "value": result[metric],
+                    "change_percent": round(
+                        100 * (result[metric] / before[metric] - 1), 1
+                    ) if before[metric] else None,
+                })
+    return regressions
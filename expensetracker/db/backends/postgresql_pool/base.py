@@ -0,0 +1,75 @@
+"""
+PostgreSQL backend that checks connections out of a per-process pool
+"""
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base
+
+from expensetracker.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+from .creation import DatabaseCreation
+
+
+def connect(conn_params, options):
+    """Open a raw connection the way the stock backend does"""
+    connection = psycopg2.connect(**conn_params)
+    isolation_level = options.get("isolation_level")
+    if (
+        isolation_level is not None
+        and isolation_level != connection.isolation_level
+    ):
+        connection.set_session(isolation_level=isolation_level)
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection, loads=lambda x: x
+    )
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    ``django.db.backends.postgresql`` with pooled connections.
+
+    Closing the connection (at the end of every request with
+    ``CONN_MAX_AGE = 0``) hands it back to the pool instead of closing
+    the socket. The pool is configured with the ``POOL`` dict of the
+    database settings, see ``ConnectionPool`` for the keys.
+    """
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            connection = self.pool.getconn()
+        except PoolTimeout as exc:
+            raise psycopg2.OperationalError(str(exc)) from exc
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict["OPTIONS"]
+
+        def make_pool():
+            pool = ConnectionPool(
+                lambda: connect(conn_params, options),
+                name="{}@{}".format(
+                    conn_params.get("database"),
+                    conn_params.get("host") or "localhost",
+                ),
+                **self.settings_dict.get("POOL", {}),
+            )
+            pool.fill()
+            return pool
+
+        key = tuple(sorted(conn_params.items()))
+        return get_pool(key, make_pool)
+
+    def _close(self):
+        if self.connection is not None:
+            # Closing inside atomic() must really close, as Django keeps
+            # the wrapper pointing at the connection until the block ends.
+            discard = self.in_atomic_block or (
+                self.errors_occurred and not self.is_usable()
+            )
+            self.pool.putconn(self.connection, discard=discard)
@@ -0,0 +1,21 @@
+"""
+Test database handling for the pooled PostgreSQL backend
+"""
+from django.db.backends.postgresql import creation
+
+from expensetracker.db.pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Close pooled connections before a database is dropped or cloned"""
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        self.close_pools(self.connection.settings_dict["NAME"])
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        self.close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def close_pools(self, database_name):
+        close_pools(lambda key: dict(key).get("database") == database_name)
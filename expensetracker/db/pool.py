@@ -0,0 +1,259 @@
+"""
+Thread-safe pool of psycopg2 connections
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of raw connections shared by the threads of a process.
+
+    Up to ``max_size`` connections are open at once; a checkout beyond
+    that waits up to ``timeout`` seconds for a connection to come back.
+    Idle connections are checked with a ping before reuse (``pre_ping``),
+    closed once idle for ``max_idle`` seconds as long as more than
+    ``min_size`` are open, and replaced after ``max_lifetime`` seconds.
+    Housekeeping happens during checkouts, there is no background thread.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, timeout=5.0,
+                 max_idle=300.0, max_lifetime=3600.0, pre_ping=True,
+                 name=""):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(
+                "Pool sizes need 0 <= min_size <= max_size and max_size >= 1"
+            )
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.name = name
+
+        self._cond = threading.Condition()
+        # (connection, opened at, returned at), most recently used last
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = dict.fromkeys((
+            "checkouts", "timeouts", "opened", "closed", "failed_pings",
+        ), 0)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def getconn(self):
+        """Check out a connection, opening one if the pool has room"""
+        started = time.monotonic()
+        while True:
+            connection, opened_at = self._acquire(started)
+            if connection is None:
+                try:
+                    connection = self.connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                opened_at = time.monotonic()
+                with self._cond:
+                    self._stats["opened"] += 1
+            elif self.pre_ping and not self.ping(connection):
+                with self._cond:
+                    self._stats["failed_pings"] += 1
+                self._close(connection)
+                self._release_slot()
+                continue
+            break
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._opened_at[connection] = opened_at
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return connection
+
+    def fill(self):
+        """Open connections until at least ``min_size`` are open"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self.connect()
+            except Exception:
+                self._release_slot()
+                raise
+            now = time.monotonic()
+            with self._cond:
+                self._stats["opened"] += 1
+                self._idle.appendleft((connection, now, now))
+                self._cond.notify()
+
+    def putconn(self, connection, discard=False):
+        """Return a checked out connection, closing it if unfit for reuse"""
+        now = time.monotonic()
+        with self._cond:
+            opened_at = self._opened_at.pop(connection, now)
+            self._in_use -= 1
+        if (
+            discard or self._closed
+            or now - opened_at >= self.max_lifetime
+            or not self.reset(connection)
+        ):
+            self._close(connection)
+            self._release_slot()
+            return
+        with self._cond:
+            self._idle.append((connection, opened_at, now))
+            self._cond.notify()
+
+    def close(self):
+        """Close the idle connections and the ones returned from now on"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                **self._stats,
+                "checkout_wait_avg_ms": (
+                    1000 * self._wait_total / checkouts if checkouts else 0.0
+                ),
+                "checkout_wait_max_ms": 1000 * self._wait_max,
+            }
+
+    def ping(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return self.reset(connection)
+        except Exception:
+            return False
+
+    def reset(self, connection):
+        """Roll back an open transaction; False if the connection is dead"""
+        if connection.closed:
+            return False
+        try:
+            if connection.info.transaction_status != 0:
+                # Not idle: in (or failed) transaction
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _acquire(self, started):
+        """Take an idle connection or reserve a slot for a new one"""
+        deadline = started + self.timeout
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    expired.extend(self._reap())
+                    if self._idle:
+                        connection, opened_at, _ = self._idle.pop()
+                        return connection, opened_at
+                    if self._size < self.max_size:
+                        self._size += 1
+                        return None, None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No connection available in {self.name} "
+                            f"after {self.timeout}s"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+        finally:
+            for connection in expired:
+                self._close(connection)
+
+    def _reap(self):
+        """Drop connections idle or open for too long, under the lock"""
+        now = time.monotonic()
+        expired = []
+        keep = deque()
+        for entry in self._idle:
+            connection, opened_at, returned_at = entry
+            too_old = now - opened_at >= self.max_lifetime
+            too_idle = (
+                now - returned_at >= self.max_idle
+                and self._size - len(expired) > self.min_size
+            )
+            if too_old or too_idle:
+                expired.append(connection)
+            else:
+                keep.append(entry)
+        self._idle = keep
+        self._size -= len(expired)
+        return expired
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _close(self, connection):
+        with self._cond:
+            self._stats["closed"] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    """The process wide pool registered under ``key``, made on first use"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+    return pool
+
+
+def close_pools(predicate=lambda key: True):
+    """Close and forget the pools whose key ``predicate`` picks"""
+    with _pools_lock:
+        keys = [key for key in _pools if predicate(key)]
+        closing = [_pools.pop(key) for key in keys]
+    for pool in closing:
+        pool.close()
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
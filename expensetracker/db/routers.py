@@ -0,0 +1,98 @@
+"""
+Routing of reads between the primary database and its read replicas
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+PRIMARY_PIN_COOKIE = "primary_pin"
+# Cache alias of the pins, shared by all worker processes
+PRIMARY_PIN_CACHE = "replica_pins"
+
+# Set for the safe requests of views using ReplicaReadMixin; the
+# ReadYourWritesMiddleware clears it at the start of every request.
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def use_replica_reads(enabled=True):
+    """Route the reads of the current request or task to a replica"""
+    _replica_reads.set(enabled)
+
+
+@contextmanager
+def replica_reads():
+    """Route the reads inside the block to a replica"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _pin_key(user):
+    return f"primary-pin:{user.pk}"
+
+
+def pin_to_primary(request, response):
+    """
+    Keep the client of ``request`` on the primary for
+    REPLICA_PIN_SECONDS, so it reads its own writes despite replica lag.
+
+    The cookie covers browser clients whatever worker they hit next; the
+    entry in the shared PRIMARY_PIN_CACHE covers token clients that drop
+    cookies. Nothing is pinned without replicas.
+    """
+    seconds = settings.REPLICA_PIN_SECONDS
+    if seconds <= 0 or not settings.DATABASE_REPLICAS:
+        return
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE, "1", max_age=seconds, httponly=True,
+        samesite="Lax",
+    )
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        caches[PRIMARY_PIN_CACHE].set(_pin_key(user), True, timeout=seconds)
+
+
+def is_pinned_to_primary(request):
+    """Whether the client of ``request`` is pinned, looked up once"""
+    if not hasattr(request, "_pinned_to_primary"):
+        user = request.user
+        request._pinned_to_primary = bool(
+            request.COOKIES.get(PRIMARY_PIN_COOKIE)
+        ) or (user.is_authenticated and bool(
+            caches[PRIMARY_PIN_CACHE].get(_pin_key(user))
+        ))
+    return request._pinned_to_primary
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica of DATABASE_REPLICAS when replica
+    reads are on for the current request, and everything else to the
+    primary.
+    """
+
+    def pick_replica(self):
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_read(self, model, **hints):
+        if model is not None and model._meta.app_label == "django_cache":
+            # Pins must be read where they are written
+            return "default"
+        if _replica_reads.get() and settings.DATABASE_REPLICAS:
+            return self.pick_replica()
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
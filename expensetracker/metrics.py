@@ -0,0 +1,83 @@
+"""
+Prometheus metrics of the expense tracker
+"""
+import os
+
+from prometheus_client import (
+    REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+    multiprocess
+)
+
+# Label used for requests that matched no URL pattern, so scanners
+# probing random paths cannot blow up the number of series
+UNMATCHED_ROUTE = "unmatched"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests served.",
+    ["route", "method", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent serving HTTP requests.",
+    ["route", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Size of HTTP response bodies.",
+    ["route", "method", "status"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+DB_QUERIES = Counter(
+    "db_queries_total", "Database queries run while serving requests.",
+    ["route"],
+)
+AUTH_FAILURES = Counter(
+    "auth_failures_total", "Refused credentials and unauthenticated requests.",
+    ["route", "reason"],
+)
+
+# Labelled children by (metric, labels). Reads are plain dict lookups;
+# Metric.labels() takes the metric's lock on every call.
+_children = {}
+
+
+def child(metric, *labels):
+    key = (metric, labels)
+    found = _children.get(key)
+    if found is None:
+        found = _children.setdefault(key, metric.labels(*labels))
+    return found
+
+
+def observe_request(route, method, status, duration, size=None, queries=0):
+    labels = (route, method, str(status))
+    child(REQUESTS, *labels).inc()
+    child(LATENCY, *labels).observe(duration)
+    if size is not None:
+        child(RESPONSE_SIZE, *labels).observe(size)
+    if queries:
+        child(DB_QUERIES, route).inc(queries)
+    if status == 401:
+        record_auth_failure(route, "unauthenticated")
+
+
+def record_auth_failure(route, reason):
+    child(AUTH_FAILURES, route, reason).inc()
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else UNMATCHED_ROUTE
+
+
+def export():
+    """
+    The metrics in the Prometheus text format. With
+    ``PROMETHEUS_MULTIPROC_DIR`` set every worker process writes its
+    samples to files there and the answering worker sums them all up.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
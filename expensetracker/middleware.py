@@ -0,0 +1,212 @@
+"""
+Middleware for the expense tracker project
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+from rest_framework.permissions import SAFE_METHODS
+
+from expensetracker import metrics, profiling
+from expensetracker.db.routers import pin_to_primary, use_replica_reads
+from expensetracker.timing import (
+    RequestTimings, current_timings, enable_query_timing
+)
+
+timing_logger = logging.getLogger("expensetracker.timing")
+
+
+class ReadYourWritesMiddleware(MiddlewareMixin):
+    """
+    Start every request on the primary database and pin the client to it
+    for a while after a successful write.
+    """
+
+    def process_request(self, request):
+        use_replica_reads(False)
+
+    def process_response(self, request, response):
+        use_replica_reads(False)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request, response)
+        return response
+
+
+class ServerTimingMiddleware(MiddlewareMixin):
+    """
+    Report the SQL, authentication and serialization time of a request in
+    a ``Server-Timing`` header and a JSON log line on the
+    ``expensetracker.timing`` logger.
+
+    Only loaded with ``SERVER_TIMING`` on; otherwise the probes in the
+    database wrapper, authentication and serializers find no timings to
+    fill and return straight away.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        enable_query_timing()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        timings = RequestTimings()
+        current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.set(None)
+        return self.report(
+            request, response, timings, time.perf_counter() - started
+        )
+
+    async def acall(self, request):
+        timings = RequestTimings()
+        current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.set(None)
+        return self.report(
+            request, response, timings, time.perf_counter() - started
+        )
+
+    def report(self, request, response, timings, total):
+        response["Server-Timing"] = timings.header(total)
+        match = request.resolver_match
+        timing_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "route": match.view_name if match else None,
+            "status": response.status_code,
+            **timings.as_dict(total),
+        }))
+        return response
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Count requests, their latency, response size and database queries per
+    route and status for the ``/metrics`` endpoint. Only loaded with
+    ``METRICS_ENABLED`` on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        enable_query_timing()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        timings, own = self.start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            if own:
+                current_timings.set(None)
+        self.observe(request, response, timings, started)
+        return response
+
+    async def acall(self, request):
+        timings, own = self.start()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if own:
+                current_timings.set(None)
+        self.observe(request, response, timings, started)
+        return response
+
+    def start(self):
+        """Share the query count of ServerTimingMiddleware if it runs"""
+        timings = current_timings.get()
+        if timings is not None:
+            return timings, False
+        timings = RequestTimings()
+        current_timings.set(timings)
+        return timings, True
+
+    def observe(self, request, response, timings, started):
+        metrics.observe_request(
+            metrics.route_of(request), request.method,
+            response.status_code, time.perf_counter() - started,
+            None if response.streaming else len(response.content),
+            timings.queries,
+        )
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    Profile requests carrying an ``X-Profile`` header signed for a staff
+    user, see expensetracker.profiling.profile_token, and a random
+    ``PROFILING_SAMPLE_RATE`` share of all requests. The profile name is
+    returned in an ``X-Profile-Id`` header.
+
+    Other requests only pay for a header lookup: the sampling thread is
+    started for profiled requests alone. Under ASGI the event loop thread
+    is sampled, so sync code run in executor threads shows up as the
+    awaiting frame.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        token = request.headers.get(profiling.PROFILE_HEADER)
+        if not (
+            profiling.token_is_valid(token) if token is not None
+            else self.sampled()
+        ):
+            return self.get_response(request)
+        sampler = profiling.start_sampler()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        return self.save(request, response, sampler, started)
+
+    async def acall(self, request):
+        token = request.headers.get(profiling.PROFILE_HEADER)
+        if not (
+            await sync_to_async(profiling.token_is_valid)(token)
+            if token is not None else self.sampled()
+        ):
+            return await self.get_response(request)
+        sampler = profiling.start_sampler()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            sampler.stop()
+        return self.save(request, response, sampler, started)
+
+    def sampled(self):
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def save(self, request, response, sampler, started):
+        response["X-Profile-Id"] = profiling.save_profile(
+            sampler, request.method, metrics.route_of(request),
+            time.perf_counter() - started,
+        )
+        return response
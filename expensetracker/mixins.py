@@ -0,0 +1,639 @@
+"""
+Reusable viewset behaviour shared by the income and expenditure APIs
+"""
+import hashlib
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models, transaction
+from django.db.models.functions import (
+    TruncDay, TruncMonth, TruncWeek, TruncYear
+)
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from expensetracker.db.routers import is_pinned_to_primary, use_replica_reads
+from expensetracker.timing import timed
+
+# DRF fields whose to_representation of a database value is a plain type
+# conversion; None means the value is used as it is
+VALUE_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.ReadOnlyField: None,
+}
+
+_values_list_fields = {}
+
+
+class UserScopedMixin:
+    """Restrict a viewset to the records of ``request.user``"""
+
+    def get_queryset(self):
+        """Override queryset to filter for user"""
+        return self.queryset.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from a read replica.
+
+    Authentication and permission checks still read the primary, and a
+    client that wrote recently stays on the primary, see
+    ``expensetracker.middleware.ReadYourWritesMiddleware``.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and settings.DATABASE_REPLICAS
+            and not is_pinned_to_primary(request)
+        ):
+            use_replica_reads()
+
+
+def values_list_fields(serializer_class):
+    """
+    ``(name, column, convert)`` for every field of ``serializer_class``
+    when all of them are plain model columns the fields only convert to
+    str or int, None when the serializer has declared fields, custom
+    representations or any other kind of field. Declared fields with a
+    ``values_list_column`` (a ``values_list`` lookup, which may follow
+    a relation) are read from that column as they are.
+    """
+    if serializer_class not in _values_list_fields:
+        _values_list_fields[serializer_class] = _plain_fields(
+            serializer_class
+        )
+    return _values_list_fields[serializer_class]
+
+
+def _plain_fields(serializer_class):
+    meta = getattr(serializer_class, "Meta", None)
+    list_serializer_class = getattr(
+        meta, "list_serializer_class", serializers.ListSerializer
+    )
+    declared = serializer_class._declared_fields
+    if (
+        not issubclass(serializer_class, serializers.ModelSerializer)
+        or any(
+            not hasattr(field, "values_list_column")
+            for field in declared.values()
+        )
+        or serializer_class.to_representation
+        is not serializers.ModelSerializer.to_representation
+        or list_serializer_class.to_representation
+        is not serializers.ListSerializer.to_representation
+    ):
+        return None
+    model = meta.model
+    fields = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if name in declared:
+            fields.append((name, field.values_list_column, None))
+            continue
+        if type(field) is serializers.UUIDField:
+            if field.uuid_format != "hex_verbose":
+                return None
+            convert = str
+        elif type(field) in VALUE_CONVERTERS:
+            convert = VALUE_CONVERTERS[type(field)]
+        else:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.is_relation:
+            return None
+        fields.append((name, model_field.attname, convert))
+    return fields
+
+
+def serialize_values(rows, fields):
+    """The representation of ``values_list`` rows of ``fields``"""
+    names = [name for name, _, _ in fields]
+    converters = [convert for _, _, convert in fields]
+    with timed("serialize"):
+        return [
+            {
+                name: value if convert is None or value is None
+                else convert(value)
+                for name, convert, value in zip(names, converters, row)
+            }
+            for row in rows
+        ]
+
+
+class ValuesListMixin:
+    """
+    List plain columns as ``values_list`` tuples instead of model
+    instances run through the serializer, with the same output. Falls
+    back to the serializer when ``values_list_fields`` finds anything
+    but plain columns or the paginator cannot page tuples.
+    """
+
+    def get_values_list_fields(self):
+        if self.paginator is not None and not hasattr(
+            self.paginator, "paginate_values_list"
+        ):
+            return None
+        return values_list_fields(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_values_list_fields()
+        if fields is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_values_list_response(
+            self.fetch_values_list(queryset, fields), fields
+        )
+
+    def fetch_values_list(self, queryset, fields):
+        columns = [column for _, column, _ in fields]
+        if self.paginator is None:
+            return list(queryset.values_list(*columns))
+        return self.paginator.paginate_values_list(
+            queryset, columns, self.request, view=self
+        )
+
+    def get_values_list_response(self, rows, fields):
+        data = serialize_values(rows, fields)
+        if self.paginator is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class ListFilterSerializer(serializers.Serializer):
+    """Query parameters filtering the list endpoints"""
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def __init__(self, *args, amount_field, filter_fields=(), orderings=(),
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.amount_field = amount_field
+        for name in filter_fields:
+            self.fields[name] = serializers.ListField(
+                child=serializers.CharField(), required=False
+            )
+        for bound in ("min", "max"):
+            self.fields[f"{amount_field}_{bound}"] = serializers.IntegerField(
+                min_value=0, required=False
+            )
+        if orderings:
+            self.fields["ordering"] = serializers.ChoiceField(
+                choices=list(orderings), required=False
+            )
+
+    def validate(self, attrs):
+        low = attrs.get(f"{self.amount_field}_min")
+        high = attrs.get(f"{self.amount_field}_max")
+        if low is not None and high is not None and low > high:
+            raise serializers.ValidationError({
+                f"{self.amount_field}_max": "Must not be below the minimum."
+            })
+        after = attrs.get("created_after")
+        before = attrs.get("created_before")
+        if after and before and after >= before:
+            raise serializers.ValidationError(
+                {"created_before": "Must be after created_after."}
+            )
+        return attrs
+
+
+class ListFilterMixin:
+    """
+    Filter the list action on ``list_filter_fields`` (repeatable, any of
+    the values), ``<amount_field>_min``/``_max`` and
+    ``created_after``/``created_before`` (inclusive/exclusive).
+
+    All parameters go into one ``WHERE`` clause next to the user, which
+    the ``(user, ...)`` indexes of the models serve. Lists without a
+    paginator are sorted by ``ordering``, one of ``list_orderings``;
+    paginated ones are sorted by the paginator.
+    """
+    list_filter_fields = ()
+    list_orderings = {
+        "-date_created": ("-date_created", "-id"),
+        "date_created": ("date_created", "id"),
+    }
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != "list":
+            return queryset
+        params = ListFilterSerializer(
+            data=self.request.query_params,
+            amount_field=self.amount_field,
+            filter_fields=self.list_filter_fields,
+            orderings=self.list_orderings if self.paginator is None else (),
+        )
+        params.is_valid(raise_exception=True)
+        params = self.list_filters = params.validated_data
+
+        lookups = {}
+        for name in self.list_filter_fields:
+            if params.get(name):
+                lookups.update(self.get_list_filter(name, params[name]))
+        for bound, lookup in (("min", "gte"), ("max", "lte")):
+            if f"{self.amount_field}_{bound}" in params:
+                lookups[f"{self.amount_field}__{lookup}"] = params[
+                    f"{self.amount_field}_{bound}"
+                ]
+        if "created_after" in params:
+            lookups["date_created__gte"] = params["created_after"]
+        if "created_before" in params:
+            lookups["date_created__lt"] = params["created_before"]
+        queryset = queryset.filter(**lookups)
+
+        if self.paginator is None:
+            ordering = params.get("ordering", next(iter(self.list_orderings)))
+            queryset = queryset.order_by(*self.list_orderings[ordering])
+        return queryset
+
+    def get_list_filter(self, name, values):
+        """The lookups matching any of ``values`` of the filter ``name``"""
+        return {f"{name}__in": values}
+
+
+class ConditionalRequestMixin:
+    """
+    Strong ETag validators for list and detail views, Last-Modified for
+    detail views.
+
+    List ETags are derived from the row count and the latest
+    ``date_modified`` of the user's records, so answering
+    ``If-None-Match`` with a 304 costs a couple of aggregate queries and
+    never loads or serializes a row. Lists carry no Last-Modified: a
+    delete never advances the latest ``date_modified``. Updates and
+    deletes honour ``If-Match``/``If-Unmodified-Since`` and fail with 412
+    when stale.
+    """
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_list_validators(request, self.get_list_state())
+        return self.conditional(
+            validators, super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            self.get_object_validators(),
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = self.conditional(
+                self.get_object_validators(lock=True),
+                super().update, request, *args, **kwargs
+            )
+        if response.status_code == status.HTTP_200_OK:
+            self.set_validators(response, self.get_object_validators())
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return self.conditional(
+                self.get_object_validators(lock=True),
+                super().destroy, request, *args, **kwargs
+            )
+
+    def conditional(self, validators, handler, request, *args, **kwargs):
+        """Answer from the validators alone or fall through to ``handler``"""
+        if validators is None:
+            # Unknown record, let the handler raise the 404
+            return handler(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            self.set_validators(response, validators)
+        return response
+
+    def get_list_state(self):
+        """Row count and latest modification time of the user's records"""
+        return self.get_queryset().aggregate(
+            count=models.Count("id"),
+            last_modified=models.Max("date_modified"),
+        )
+
+    def get_list_validators(self, request, state):
+        return self.make_validators(
+            request.get_full_path(), state["count"], state["last_modified"]
+        )
+
+    def get_object_validators(self, lock=False):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        if lock:
+            queryset = queryset.select_for_update()
+        try:
+            row = queryset.values_list("pk", "date_modified").first()
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if row is None:
+            return None
+        return self.make_validators(*row, last_modified=row[1])
+
+    def make_validators(self, *parts, last_modified=None):
+        """Hash ``parts`` into a strong ETag scoped to user and media type"""
+        parts = (
+            self.request.user.pk, self.request.accepted_media_type,
+        ) + parts
+        etag = hashlib.sha1(repr(parts).encode()).hexdigest()
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        return quote_etag(etag), last_modified
+
+    def set_validators(self, response, validators):
+        etag, last_modified = validators
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+
+
+class BulkSelectionSerializer(serializers.Serializer):
+    """Pick records either by a list of ids or by field values"""
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, required=False
+    )
+    filter = serializers.DictField(allow_empty=False, required=False)
+    changes = serializers.DictField(allow_empty=False, required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                "Provide exactly one of 'ids' or 'filter'."
+            )
+        max_items = self.context["max_items"]
+        if len(attrs.get("ids", [])) > max_items:
+            raise serializers.ValidationError(
+                {"ids": f"At most {max_items} ids per request."}
+            )
+        return attrs
+
+
+class BulkCreateMixin:
+    """
+    Create a batch of records in one transaction.
+
+    The serializer's ``list_serializer_class`` is expected to write the
+    whole batch at once (e.g. with ``bulk_create``). Invalid items are
+    reported with their index and nothing is saved.
+    """
+    bulk_max_items = 5000
+
+    def bulk_create(self, request):
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_items
+        )
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, list):
+                # Report every invalid item against its position
+                errors = [
+                    {"index": index, "errors": item_errors}
+                    for index, item_errors in enumerate(errors)
+                    if item_errors
+                ]
+            return Response(
+                {"errors": errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class BulkUpdateDestroyMixin:
+    """
+    Batch PATCH and DELETE on ``bulk/`` for a user scoped viewset.
+
+    Records are selected by ``ids`` or by a ``filter`` of field values and
+    changed with one set based ``UPDATE``/``DELETE`` restricted to
+    ``get_queryset()``. Every selected id gets its own outcome.
+    """
+    bulk_max_items = 5000
+
+    @action(detail=False, methods=["patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        """Update or delete a batch of records"""
+        if request.method == "DELETE":
+            return self.bulk_destroy(request)
+        return self.bulk_update(request)
+
+    def bulk_update(self, request):
+        selection = self.get_bulk_selection(request, changes_required=True)
+        changes = self.validate_bulk_fields(selection["changes"], "changes")
+        with transaction.atomic():
+            ids = self.get_bulk_ids(selection)
+            self.perform_bulk_update(
+                self.get_queryset().filter(id__in=ids), changes
+            )
+        return self.get_bulk_response(selection, ids, "updated")
+
+    def bulk_destroy(self, request):
+        selection = self.get_bulk_selection(request)
+        with transaction.atomic():
+            ids = self.get_bulk_ids(selection)
+            self.perform_bulk_destroy(self.get_queryset().filter(id__in=ids))
+        return self.get_bulk_response(selection, ids, "deleted")
+
+    def perform_bulk_update(self, queryset, changes):
+        queryset.update(date_modified=timezone.now(), **changes)
+
+    def perform_bulk_destroy(self, queryset):
+        queryset.delete()
+
+    def get_bulk_selection(self, request, changes_required=False):
+        selection = BulkSelectionSerializer(
+            data=request.data, context={"max_items": self.bulk_max_items}
+        )
+        selection.is_valid(raise_exception=True)
+        if changes_required and "changes" not in selection.validated_data:
+            raise serializers.ValidationError(
+                {"changes": "This field is required."}
+            )
+        selection = selection.validated_data
+        if "filter" in selection:
+            selection["filter"] = self.validate_bulk_fields(
+                selection["filter"], "filter"
+            )
+        return selection
+
+    def validate_bulk_fields(self, data, key):
+        """Validate field values with the viewset's own serializer"""
+        serializer = self.get_serializer(data=data, partial=True)
+        if not serializer.is_valid():
+            raise serializers.ValidationError({key: serializer.errors})
+        unknown = set(data) - set(serializer.validated_data)
+        if unknown:
+            raise serializers.ValidationError({
+                key: f"Unknown field(s): {', '.join(sorted(unknown))}."
+            })
+        return serializer.validated_data
+
+    def get_bulk_ids(self, selection):
+        """Lock and return the ids of the selected records"""
+        queryset = self.get_queryset().select_for_update()
+        if "ids" in selection:
+            queryset = queryset.filter(id__in=selection["ids"])
+        else:
+            queryset = queryset.filter(**selection["filter"])
+        ids = set(
+            queryset.values_list("id", flat=True)[:self.bulk_max_items + 1]
+        )
+        if len(ids) > self.bulk_max_items:
+            raise serializers.ValidationError({
+                "filter": (
+                    f"Matches more than {self.bulk_max_items} records."
+                )
+            })
+        return ids
+
+    def get_bulk_response(self, selection, ids, outcome):
+        requested = selection.get("ids", sorted(ids))
+        results = [
+            {"id": pk, "status": outcome if pk in ids else "not_found"}
+            for pk in dict.fromkeys(requested)
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class SeriesQuerySerializer(serializers.Serializer):
+    """Query parameters of the time series endpoints"""
+    TRUNCATE = {
+        "day": TruncDay,
+        "week": TruncWeek,
+        "month": TruncMonth,
+        "year": TruncYear,
+    }
+
+    bucket = serializers.ChoiceField(choices=list(TRUNCATE), default="month")
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    tz = serializers.CharField(default=settings.TIME_ZONE)
+    group_by = serializers.ChoiceField(choices=[], required=False)
+
+    def __init__(self, *args, group_fields=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["group_by"].choices = list(group_fields)
+
+    def validate_tz(self, value):
+        try:
+            return ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError(f"Unknown time zone '{value}'.")
+
+    def validate(self, attrs):
+        start, end = attrs.get("start"), attrs.get("end")
+        if start and end and start > end:
+            raise serializers.ValidationError(
+                {"end": "Must not be before start."}
+            )
+        return attrs
+
+
+class TimeSeriesMixin:
+    """
+    Totals of ``amount_field`` per time bucket on ``series/``.
+
+    Truncation, grouping and summing all happen in SQL, so the response
+    size depends on the number of buckets rather than on the number of
+    rows. Buckets are computed in the requested time zone.
+    """
+    amount_field = None
+    series_group_fields = ()
+
+    @action(detail=False, methods=["get"], url_path="series")
+    def series(self, request):
+        """Totals per day, week, month or year"""
+        params = SeriesQuerySerializer(
+            data=request.query_params, group_fields=self.series_group_fields
+        )
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        tz = params["tz"]
+
+        queryset = self.get_queryset()
+        if "start" in params:
+            queryset = queryset.filter(
+                date_created__gte=datetime.combine(
+                    params["start"], time.min, tzinfo=tz
+                )
+            )
+        if "end" in params:
+            queryset = queryset.filter(
+                date_created__lt=datetime.combine(
+                    params["end"] + timedelta(days=1), time.min, tzinfo=tz
+                )
+            )
+
+        truncate = SeriesQuerySerializer.TRUNCATE[params["bucket"]]
+        group = [params["group_by"]] if "group_by" in params else []
+        rows = (
+            queryset
+            .annotate(period=truncate(
+                "date_created", output_field=models.DateField(), tzinfo=tz
+            ))
+            .values("period", *group)
+            .annotate(
+                total=models.Sum(self.amount_field),
+                count=models.Count("id"),
+            )
+            .order_by("period", *group)
+        )
+        results = self.label_series(list(rows), group)
+        extra = self.get_extra_series(params, truncate, group)
+        if extra:
+            results = merge_series(results, extra, group)
+        return Response({
+            "bucket": params["bucket"],
+            "tz": str(tz),
+            "results": results,
+        })
+
+    def label_series(self, rows, group):
+        """Hook replacing the grouped values of ``rows`` for display"""
+        return rows
+
+    def get_extra_series(self, params, truncate, group):
+        """Hook adding labelled bucket totals kept outside of the queryset"""
+        return []
+
+
+def merge_series(rows, extra, group):
+    """Add up the totals and counts of both series bucket by bucket"""
+    buckets = {}
+    for row in [*rows, *extra]:
+        key = (row["period"], *(row[name] for name in group))
+        if key in buckets:
+            buckets[key]["total"] += row["total"]
+            buckets[key]["count"] += row["count"]
+        else:
+            buckets[key] = dict(row)
+    return [buckets[key] for key in sorted(buckets)]
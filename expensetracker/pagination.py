@@ -0,0 +1,283 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from functools import cmp_to_key
+from uuid import UUID
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _positive_int(value, cutoff):
+    """Parse a strictly positive integer, capped at ``cutoff``"""
+    value = int(value)
+    if value <= 0:
+        raise ValueError(value)
+    return min(value, cutoff)
+
+
+def _encode_value(value):
+    """Make a cursor position value JSON friendly without losing precision"""
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def follows(values, position, ordering):
+    """
+    Whether ordering ``values`` come strictly after ``position``, the
+    Python counterpart of ``KeysetPagination.get_keyset_filter``
+    """
+    for name, value, bound in zip(ordering, values, position):
+        if value != bound:
+            return value < bound if name.startswith("-") else value > bound
+    return False
+
+
+def sort_rows(rows, ordering, key):
+    """``rows`` in the order ``ORDER BY ordering`` gives their ``key``"""
+    def compare(first, second):
+        if follows(key(first), key(second), ordering):
+            return 1
+        return -1 if follows(key(second), key(first), ordering) else 0
+
+    return sorted(rows, key=cmp_to_key(compare))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on the ordering key of the last row instead of an offset.
+
+    Every page is a single ``ORDER BY ... LIMIT`` query starting strictly
+    after the position stored in the cursor, so page N costs the same as
+    page 1 and no ``COUNT(*)`` is ever issued. The last ordering field
+    must be unique (the primary key) so that positions never tie.
+
+    Clients pick one of ``orderings`` with the ``ordering`` parameter.
+    Primary keys are UUIDv7, so ``id`` follows creation time for every
+    row created since the switch and makes a single column key.
+    """
+    ordering = ("-date_created", "-id")
+    orderings = {
+        "-date_created": ("-date_created", "-id"),
+        "date_created": ("date_created", "id"),
+        "-id": ("-id",),
+        "id": ("id",),
+    }
+    ordering_query_param = "ordering"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = self.paginate(queryset, request)
+        if self.has_next:
+            self.next_position = [
+                field.value_from_object(rows[-1]) for field in self.fields
+            ]
+        return rows
+
+    def paginate_values_list(self, queryset, columns, request, view=None,
+                             extra_rows=None):
+        """
+        ``paginate_queryset`` returning tuples of the ``columns`` (field
+        attnames) instead of model instances. Ordering columns missing
+        from ``columns`` are fetched as well and cut off again.
+
+        ``extra_rows(ordering, position)`` adds rows kept outside of the
+        queryset, see ``merge_extra_rows``, as dicts of the columns.
+        """
+        fields = self.get_ordering_fields(queryset.model, request)
+        extra = [
+            field.attname for field in fields if field.attname not in columns
+        ]
+        selected = [*columns, *extra]
+        positions = [selected.index(field.attname) for field in fields]
+        rows = self.paginate(
+            queryset.values_list(*selected), request, extra_rows and (
+                lambda ordering, position: (
+                    [tuple(row[name] for name in selected) for row in batch]
+                    for batch in extra_rows(ordering, position)
+                )
+            ),
+            key=lambda row: [row[index] for index in positions],
+        )
+        if self.has_next:
+            self.next_position = [rows[-1][index] for index in positions]
+        if extra:
+            rows = [row[:len(columns)] for row in rows]
+        return rows
+
+    def paginate(self, queryset, request, extra_rows=None, key=None):
+        """The rows of the requested page, sets ``has_next``"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering_fields(queryset.model, request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        if extra_rows is not None:
+            rows = self.merge_extra_rows(rows, extra_rows, key, position)
+        self.has_next = len(rows) > self.page_size
+        self.next_position = None
+        return rows[:self.page_size]
+
+    def merge_extra_rows(self, rows, extra_rows, key, position):
+        """
+        Merge the batches of ``extra_rows(ordering, position)`` that
+        follow ``position`` into the fetched ``rows`` in page order. Every
+        batch must sort wholly after the previous ones, so the merge stops
+        at the first batch past the end of the page; ``position`` lets it
+        skip the batches before the page.
+        """
+        limit = self.page_size + 1
+        for batch in extra_rows(self.ordering, position):
+            if not batch:
+                continue
+            batch = sort_rows(batch, self.ordering, key)
+            if len(rows) >= limit and follows(
+                key(batch[0]), key(rows[-1]), self.ordering
+            ):
+                break
+            if position is not None:
+                batch = [
+                    row for row in batch
+                    if follows(key(row), position, self.ordering)
+                ]
+            rows = sort_rows(rows + batch, self.ordering, key)[:limit]
+        return rows
+
+    def get_ordering_fields(self, model, request):
+        self.ordering = self.get_ordering(request)
+        return [
+            model._meta.get_field(name.lstrip("-"))
+            for name in self.ordering
+        ]
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return min(self.page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        """The requested ordering, unknown values fall back to the default"""
+        value = request.query_params.get(self.ordering_query_param)
+        return self.orderings.get(value, type(self).ordering)
+
+    def get_keyset_filter(self, position):
+        """
+        Build ``(f1, f2, ...) > (p1, p2, ...)`` as a chain of ORs,
+        honouring the direction of every ordering field.
+        """
+        keyset = Q()
+        equal = Q()
+        for name, field, value in zip(self.ordering, self.fields, position):
+            lookup = "lt" if name.startswith("-") else "gt"
+            keyset |= equal & Q(**{f"{field.attname}__{lookup}": value})
+            equal &= Q(**{field.attname: value})
+        return keyset
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+            )
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (
+            TypeError, ValueError, UnicodeError,
+            binascii.Error, DjangoValidationError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        payload = json.dumps([_encode_value(value) for value in position])
+        return base64.urlsafe_b64encode(payload.encode("ascii")).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param,
+            self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor taken from the `next` link",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Number of results per page "
+                    f"(at most {self.max_page_size})"
+                ),
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Sort key, `-` for descending",
+                "schema": {
+                    "type": "string",
+                    "enum": list(self.orderings),
+                    "default": self.ordering[0],
+                },
+            },
+        ]
@@ -0,0 +1,118 @@
+"""
+On-demand statistical profiling of single requests
+"""
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_SUFFIX = ".collapsed"
+SIGNING_SALT = "expensetracker.profiling"
+
+
+def profile_token(user):
+    """Value of the ``X-Profile`` header that profiles requests for ``user``"""
+    return signing.dumps({"user": str(user.pk)}, salt=SIGNING_SALT)
+
+
+def token_is_valid(token):
+    """Whether ``token`` was issued to a still active staff user"""
+    try:
+        payload = signing.loads(
+            token, salt=SIGNING_SALT,
+            max_age=settings.PROFILING_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return get_user_model().objects.filter(
+        pk=payload["user"], is_staff=True, is_active=True
+    ).exists()
+
+
+class Sampler(threading.Thread):
+    """
+    Record the stack of one thread every ``interval`` seconds until
+    stopped. ``stacks`` counts the samples per stack, outermost frame
+    first, in the collapsed format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.relpath(code.co_filename, settings.BASE_DIR)
+        if filename.startswith(".."):
+            filename = os.path.basename(code.co_filename)
+        names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def start_sampler():
+    sampler = Sampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+    sampler.start()
+    return sampler
+
+
+def save_profile(sampler, method, route, duration):
+    """
+    Write the samples to ``PROFILING_DIR`` and delete the oldest profiles
+    beyond ``PROFILING_KEEP``. Returns the file name.
+    """
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    moment = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+    route = re.sub(r"[^\w.-]", "-", route)
+    name = (
+        f"{moment}_{method}_{route}_{round(duration * 1000)}ms"
+        f"{PROFILE_SUFFIX}"
+    )
+    with open(os.path.join(directory, name), "w") as file:
+        file.writelines(
+            f"{stack} {samples}\n"
+            for stack, samples in sampler.stacks.most_common()
+        )
+    for old in list_profiles()[settings.PROFILING_KEEP:]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            # Another worker rotated it out first
+            pass
+    return name
+
+
+def list_profiles():
+    """Profile file names, newest first"""
+    try:
+        names = os.listdir(settings.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (name for name in names if name.endswith(PROFILE_SUFFIX)),
+        reverse=True,
+    )
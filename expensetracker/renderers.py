@@ -0,0 +1,85 @@
+"""
+Response renderers for the expense tracker APIs
+"""
+import msgpack
+import orjson
+
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+from expensetracker.timing import timed
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def encode_default(value):
+    """
+    Types orjson and msgpack have no native encoding for (Decimal, lazy
+    strings, querysets, ...), encoded like DRF's JSON renderer does
+    """
+    return JSONEncoder().default(value)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer adding its encoding time to the request timings"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("serialize"):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer on orjson, several times faster than the stdlib ``json``
+    on large lists. Output matches DRF's renderer: UTC datetimes end in
+    ``Z``, UUIDs are strings. Indented output and integers beyond 64 bits,
+    which orjson cannot write, go through the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        with timed("serialize"):
+            try:
+                ret = orjson.dumps(
+                    data, default=encode_default, option=ORJSON_OPTIONS
+                )
+            except orjson.JSONEncodeError:
+                ret = None
+        if ret is None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Same strict javascript subset as DRF's renderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    MessagePack renderer for clients sending ``Accept: application/msgpack``.
+    Values are the same as in the JSON responses; integers cover the
+    whole signed and unsigned 64 bit range.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with timed("serialize"):
+            return msgpack.packb(
+                data, default=encode_default, use_bin_type=True,
+                datetime=False,
+            )
@@ -14,6 +14,8 @@ from pathlib import Path
 import configparser
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "drf_spectacular",
@@ -50,10 +53,15 @@ INSTALLED_APPS = [
     "user",
     "income",
     "expenditure",
+    "ledger",
 ]
 
 MIDDLEWARE = [
+    "expensetracker.middleware.ProfilingMiddleware",
+    "expensetracker.middleware.ServerTimingMiddleware",
+    "expensetracker.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "expensetracker.middleware.ReadYourWritesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,7 +75,7 @@ ROOT_URLCONF = "expensetracker.urls"
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
+        "DIRS": [BASE_DIR / "expensetracker" / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -97,6 +105,81 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASS"),
     }
 }
+if os.environ.get("DB_ENGINE") == "sqlite":
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / os.environ.get("DB_NAME", "db.sqlite3"),
+    }
+
+# Per-process connection pool, see expensetracker.db.pool.ConnectionPool.
+# Every worker process opens at most DB_POOL_MAX_SIZE connections, so keep
+# workers * DB_POOL_MAX_SIZE below the server's max_connections.
+if (
+    os.environ.get("DB_POOL", "true") == "true"
+    and os.environ.get("DB_ENGINE") != "sqlite"
+):
+    DATABASES["default"]["ENGINE"] = (
+        "expensetracker.db.backends.postgresql_pool"
+    )
+    DATABASES["default"]["POOL"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 1)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 5)),
+        "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+        "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+        "pre_ping": os.environ.get("DB_POOL_PRE_PING", "true") == "true",
+    }
+
+# Read replicas: comma separated hosts (host or host:port) of PostgreSQL
+# standbys, or file names next to manage.py with DB_ENGINE=sqlite.
+# Each becomes a "replicaN" alias sharing the credentials of the primary.
+# Safe requests of the views using expensetracker.mixins.ReplicaReadMixin
+# read a random replica, unless the client wrote in the last
+# REPLICA_PIN_SECONDS; everything else uses "default".
+for index, replica in enumerate(
+    filter(None, os.environ.get("DB_REPLICAS", "").split(",")), start=1
+):
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+        location = {"NAME": BASE_DIR / replica.strip()}
+    else:
+        host, _, port = replica.strip().partition(":")
+        location = {"HOST": host, "PORT": port}
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"], **location,
+        # Tests read the rows they write through the replica aliases
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["expensetracker.db.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+# Pins of token clients to the primary, see
+# expensetracker.db.routers.pin_to_primary. Every worker has to see them,
+# so with replicas this must be a cache shared between processes: by
+# default a table of the primary (manage.py createcachetable).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "replica_pins": {
+        "BACKEND": os.environ.get(
+            "REPLICA_PIN_CACHE_BACKEND",
+            "django.core.cache.backends.db.DatabaseCache",
+        ),
+        "LOCATION": os.environ.get(
+            "REPLICA_PIN_CACHE_LOCATION", "replica_pin_cache"
+        ),
+    },
+}
+if DATABASE_REPLICAS and CACHES["replica_pins"]["BACKEND"] in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+):
+    raise ImproperlyConfigured(
+        "DB_REPLICAS needs a REPLICA_PIN_CACHE_BACKEND shared between "
+        "processes."
+    )
 
 
 # Password validation
@@ -118,6 +201,31 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashers. New passwords are hashed with the first one and older
+# hashes are upgraded to it on the next successful login. PASSWORD_HASHER
+# picks the preferred one, e.g.
+# django.contrib.auth.hashers.Argon2PasswordHasher.
+# https://docs.djangoproject.com/en/4.1/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.environ.get("PASSWORD_HASHER"):
+    PASSWORD_HASHERS = [os.environ["PASSWORD_HASHER"]] + [
+        hasher for hasher in PASSWORD_HASHERS
+        if hasher != os.environ["PASSWORD_HASHER"]
+    ]
+
+# Thread pool of the async login (user.views.AsyncLoginView). Logins beyond
+# LOGIN_HASH_QUEUE_LIMIT running or queued hashes are refused with a 503.
+LOGIN_HASH_WORKERS = int(os.environ.get("LOGIN_HASH_WORKERS", 4))
+LOGIN_HASH_QUEUE_LIMIT = int(os.environ.get("LOGIN_HASH_QUEUE_LIMIT", 64))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
 
@@ -144,11 +252,106 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "user.User"
 
+# JSON bodies are encoded and decoded with orjson; FAST_JSON=false falls
+# back to the stdlib json module. Clients sending
+# "Accept: application/msgpack" or "Content-Type: application/msgpack"
+# get MessagePack instead.
+if os.environ.get("FAST_JSON", "true") == "true":
+    JSON_RENDERER = "expensetracker.renderers.ORJSONRenderer"
+    JSON_PARSER = "expensetracker.parsers.ORJSONParser"
+else:
+    JSON_RENDERER = "expensetracker.renderers.JSONRenderer"
+    JSON_PARSER = "rest_framework.parsers.JSONParser"
+
 REST_FRAMEWORK = {
-    # "DEFAULT_PARSER_CLASSES": ("rest_framework.parsers.JSONParser"),
+    "DEFAULT_PARSER_CLASSES": (
+        JSON_PARSER,
+        "expensetracker.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        "user.authentication.TokenAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        JSON_RENDERER,
+        "expensetracker.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "TEST_REQUEST_RENDERER_CLASSES": (
+        "rest_framework.renderers.MultiPartRenderer",
+        JSON_RENDERER,
+        "expensetracker.renderers.MessagePackRenderer",
+    ),
 }
+
+# Server-Timing header and a JSON log line with the SQL count and time,
+# authentication and serialization time of every request, see
+# expensetracker.middleware.ServerTimingMiddleware. Off, the middleware
+# is not loaded at all.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "false") == "true"
+
+# Prometheus metrics on /metrics, see expensetracker.metrics. When
+# running several worker processes (gunicorn, uvicorn --workers) point
+# PROMETHEUS_MULTIPROC_DIR at an empty directory shared by the workers of
+# one host so that /metrics adds up all of them. With METRICS_TOKEN set
+# scrapes must send "Authorization: Bearer <token>".
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true") == "true"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Statistical profiles of single requests, see
+# expensetracker.middleware.ProfilingMiddleware. Staff profile a request
+# with the X-Profile header shown on /admin/profiles/, where the profiles
+# can be downloaded; PROFILING_SAMPLE_RATE (0 to 1) profiles that share
+# of all requests. Only the newest PROFILING_KEEP profiles are kept.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "true") == "true"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_INTERVAL = float(os.environ.get("PROFILING_INTERVAL", 0.005))
+PROFILING_DIR = os.environ.get("PROFILING_DIR", BASE_DIR / "profiles")
+PROFILING_KEEP = int(os.environ.get("PROFILING_KEEP", 100))
+PROFILING_TOKEN_MAX_AGE = int(
+    os.environ.get("PROFILING_TOKEN_MAX_AGE", 3600)
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "expensetracker.timing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# "sync" serves the income and expenditure APIs with the regular
+# viewsets (WSGI or ASGI); "async" swaps in the coroutine viewsets of
+# expensetracker.async_views, which only pay off behind an ASGI server.
+API_MODE = os.environ.get("API_MODE", "sync")
+# Threads (and so database connections) shared by the ORM calls of the
+# async viewsets. 0 keeps Django's default of one thread per request.
+ASYNC_DB_THREADS = int(os.environ.get("ASYNC_DB_THREADS", 0))
+
+# In-process cache of authenticated users for JWT requests, see
+# user.authentication.CachedJWTAuthentication. Disable it to query the
+# user row on every request.
+USER_CACHE_ENABLED = os.environ.get("USER_CACHE_ENABLED", "true") == "true"
+USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", 1024))
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 30))
+
+# Per process cache of blacklisted refresh tokens, see
+# user.blacklist.BlacklistCache. New blacklist rows are picked up every
+# TOKEN_BLACKLIST_SYNC_INTERVAL seconds and the whole set is reloaded every
+# TOKEN_BLACKLIST_RELOAD_INTERVAL seconds.
+TOKEN_BLACKLIST_SYNC_INTERVAL = float(
+    os.environ.get("TOKEN_BLACKLIST_SYNC_INTERVAL", 5)
+)
+TOKEN_BLACKLIST_RELOAD_INTERVAL = float(
+    os.environ.get("TOKEN_BLACKLIST_RELOAD_INTERVAL", 300)
+)
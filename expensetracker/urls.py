@@ -21,8 +21,25 @@ from drf_spectacular.views import (
     SpectacularSwaggerView
 )
 
+from expensetracker.views import (
+    DatabasePoolView,
+    metrics_view,
+    profile_download,
+    profile_list
+)
+
 
 urlpatterns = [
+    path(
+        "admin/profiles/",
+        admin.site.admin_view(profile_list),
+        name="admin-profiles"
+    ),
+    path(
+        "admin/profiles/<str:name>",
+        admin.site.admin_view(profile_download),
+        name="admin-profile-download"
+    ),
     path("admin/", admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
     path(
@@ -36,4 +53,7 @@ urlpatterns = [
     path("auth/", include("user.urls")),
     path("income/", include("income.urls")),
     path("expenditure/", include("expenditure.urls")),
+    path("ledger/", include("ledger.urls")),
+    path("internal/db-pool/", DatabasePoolView.as_view(), name="db-pool"),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,66 @@
+"""
+Operational endpoints of the expense tracker
+"""
+import os
+
+from django.conf import settings
+from django.contrib import admin
+from django.http import FileResponse, Http404, HttpResponse
+from django.template.response import TemplateResponse
+from django.utils.crypto import constant_time_compare
+
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from expensetracker import metrics, profiling
+from expensetracker.db.pool import pool_stats
+
+
+class DatabasePoolView(APIView):
+    """Connection pool usage of this worker process, for staff"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"pools": pool_stats()})
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint"""
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get("Authorization", ""),
+        f"Bearer {settings.METRICS_TOKEN}",
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.export(), content_type=CONTENT_TYPE_LATEST)
+
+
+def profile_list(request):
+    """Admin page listing the stored request profiles"""
+    profiles = []
+    for name in profiling.list_profiles():
+        try:
+            size = os.path.getsize(os.path.join(settings.PROFILING_DIR, name))
+        except FileNotFoundError:
+            continue
+        profiles.append({"name": name, "size": size})
+    return TemplateResponse(request, "admin/profiles.html", {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": profiles,
+        "header": profiling.PROFILE_HEADER,
+        "token": profiling.profile_token(request.user),
+        "token_max_age": settings.PROFILING_TOKEN_MAX_AGE,
+    })
+
+
+def profile_download(request, name):
+    """Download one stored request profile"""
+    if name not in profiling.list_profiles():
+        raise Http404
+    return FileResponse(
+        open(os.path.join(settings.PROFILING_DIR, name), "rb"),
+        as_attachment=True, filename=name, content_type="text/plain",
+    )
@@ -0,0 +1,51 @@
+"""
+Benchmarks for the User's Income Endpoints
+"""
+from expensetracker.benchmarking import benchmark
+
+from .models import Income
+
+INCOME_URL = "/income/user/"
+
+
+def latest_income(context):
+    return {"pk": Income.objects.filter(user=context.user).latest("id").pk}
+
+
+def new_income(context):
+    income = Income.objects.create(
+        user=context.user, name_of_revenue="benchmark", amount=10
+    )
+    return {"pk": income.pk}
+
+
+@benchmark("income.list")
+def list_income(context):
+    return context.client.get(INCOME_URL)
+
+
+@benchmark("income.retrieve", setup=latest_income)
+def retrieve_income(context, pk):
+    return context.client.get(f"{INCOME_URL}{pk}/")
+
+
+@benchmark("income.series")
+def income_series(context):
+    return context.client.get(f"{INCOME_URL}series/", {"bucket": "month"})
+
+
+@benchmark("income.create")
+def create_income(context):
+    return context.client.post(
+        INCOME_URL, {"name_of_revenue": "salary", "amount": 100}
+    )
+
+
+@benchmark("income.update", setup=latest_income)
+def update_income(context, pk):
+    return context.client.patch(f"{INCOME_URL}{pk}/", {"amount": 120})
+
+
+@benchmark("income.delete", setup=new_income)
+def delete_income(context, pk):
+    return context.client.delete(f"{INCOME_URL}{pk}/")
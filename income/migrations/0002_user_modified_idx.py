@@ -0,0 +1,20 @@
+# Generated by Django 4.1.4 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("income", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="income",
+            index=models.Index(
+                fields=["user", "date_modified"],
+                name="income_user_modified_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.4 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("income", "0003_uuid7_ids"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="income",
+            index=models.Index(
+                fields=["user", "date_created", "id"],
+                name="income_user_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="income",
+            index=models.Index(
+                fields=["user", "amount", "id"],
+                name="income_user_amount_idx",
+            ),
+        ),
+    ]
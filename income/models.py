@@ -1,9 +1,9 @@
 """
 Models for Income/Revenue
 """
-from uuid import uuid4
-
 from django.db import models
+
+from expensetracker.uuids import uuid7
 from user.models import User
 
 
@@ -11,7 +11,7 @@ class Income(models.Model):
     id = models.UUIDField(
         primary_key=True,
         unique=True, db_index=True,
-        default=uuid4, editable=False
+        default=uuid7, editable=False
     )
     date_created = models.DateTimeField(auto_now_add=True)
     date_modified = models.DateTimeField(auto_now=True)
@@ -19,6 +19,25 @@ class Income(models.Model):
     name_of_revenue = models.CharField(max_length=255)
     amount = models.PositiveBigIntegerField()
 
+    class Meta:
+        indexes = [
+            # Latest modification time for the list ETag
+            models.Index(
+                fields=["user", "date_modified"],
+                name="income_user_modified_idx",
+            ),
+            # Creation time ranges and the default ordering of the list
+            models.Index(
+                fields=["user", "date_created", "id"],
+                name="income_user_created_idx",
+            ),
+            # Amount ranges and amount ordering of the list
+            models.Index(
+                fields=["user", "amount", "id"],
+                name="income_user_amount_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name_of_revenue
 
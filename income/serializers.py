@@ -2,13 +2,17 @@
 Serializers for Income
 """
 from rest_framework import serializers
+
+from expensetracker.timing import TimedListSerializer, TimedSerializerMixin
+
 from .models import Income
 
 
-class IncomeSerializer(serializers.ModelSerializer):
+class IncomeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Searializer for Income model"""
 
     class Meta:
         model = Income
         fields = ["id", "name_of_revenue", "amount"]
         read_only_fields = ["id"]
+        list_serializer_class = TimedListSerializer
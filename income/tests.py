@@ -9,6 +9,8 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from income.models import Income
+
 
 def create_user(**params):
     """Signup and return a new user"""
@@ -174,5 +176,160 @@ class IncomeAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(response2.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_bulk_update_income_by_ids(self):
+        """Update the amount of several income records at once"""
+
+        ids = [
+            self.client.post(
+                "/income/user/", {"name_of_revenue": "salary", "amount": 100}
+            ).data["id"]
+            for _ in range(2)
+        ]
+
+        response = self.client.patch("/income/user/bulk/", {
+            "ids": ids,
+            "changes": {"amount": 200}
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data["results"]],
+            ["updated", "updated"]
+        )
+        response = self.client.get("/income/user/")
+        self.assertEqual({item["amount"] for item in response.data}, {200})
+
+    def test_bulk_update_income_with_unknown_field(self):
+        """Only serializer fields can be changed in bulk"""
+
+        response = self.client.patch("/income/user/bulk/", {
+            "filter": {"name_of_revenue": "salary"},
+            "changes": {"user": "someone-else"}
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_income_requires_selection(self):
+        """Either ids or a filter must be given"""
+
+        response = self.client.delete(
+            "/income/user/bulk/", {}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_income_by_filter(self):
+        """Delete every income record matching a filter"""
+
+        self.client.post(
+            "/income/user/", {"name_of_revenue": "salary", "amount": 100}
+        )
+        self.client.post(
+            "/income/user/", {"name_of_revenue": "bonus", "amount": 100}
+        )
+
+        response = self.client.delete("/income/user/bulk/", {
+            "filter": {"name_of_revenue": "salary"}
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["status"], "deleted")
+        response = self.client.get("/income/user/")
+        self.assertEqual(len(response.data), 1)
+
+    def test_income_series_by_year(self):
+        """Yearly income totals are computed in the database"""
+
+        for amount, created in [
+            (100, "2025-06-01T12:00:00Z"),
+            (200, "2026-01-01T12:00:00Z"),
+            (300, "2026-02-01T12:00:00Z"),
+        ]:
+            response = self.client.post(
+                "/income/user/",
+                {"name_of_revenue": "salary", "amount": amount}
+            )
+            Income.objects.filter(pk=response.data["id"]).update(
+                date_created=created
+            )
+
+        response = self.client.get("/income/user/series/?bucket=year")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (str(row["period"]), row["total"], row["count"])
+                for row in response.data["results"]
+            ],
+            [("2025-01-01", 100, 1), ("2026-01-01", 500, 2)]
+        )
+
+    def test_income_series_cannot_group_by_category(self):
+        """Income has no category to group by"""
+
+        response = self.client.get("/income/user/series/?group_by=category")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_income_not_modified(self):
+        """Unchanged income data is answered with 304"""
+
+        created = self.client.post(
+            "/income/user/", {"name_of_revenue": "salary", "amount": 100}
+        )
+        for url in [
+            "/income/user/",
+            "/income/user/{}/".format(created.data["id"]),
+        ]:
+            response = self.client.get(url)
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_304_NOT_MODIFIED
+            )
+
+    def test_delete_income_with_matching_etag(self):
+        """A delete with the current ETag succeeds"""
+
+        created = self.client.post(
+            "/income/user/", {"name_of_revenue": "salary", "amount": 100}
+        )
+        url = "/income/user/{}/".format(created.data["id"])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.delete(url, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_list_income_filtered_and_ordered(self):
+        """Amount filters and the ordering parameter apply to the list"""
+        for amount in [50, 150, 120, 900]:
+            self.client.post("/income/user/", {
+                "name_of_revenue": "salary", "amount": amount
+            })
+
+        response = self.client.get(
+            "/income/user/",
+            {"amount_min": 100, "amount_max": 500, "ordering": "-amount"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["amount"] for item in response.data], [150, 120]
+        )
+        response = self.client.get(
+            "/income/user/", {"ordering": "date_created"}
+        )
+        self.assertEqual(
+            [item["amount"] for item in response.data], [50, 150, 120, 900]
+        )
+
+    def test_list_income_with_unknown_ordering(self):
+        """Only the listed orderings are accepted"""
+        response = self.client.get("/income/user/", {"ordering": "user"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 # Create your tests here.
@@ -1,15 +1,20 @@
 """
 Urls for Income API
 """
+from django.conf import settings
 from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from .views import IncomeAPIView
+from .views import AsyncIncomeAPIView, IncomeAPIView
 
 
 router = DefaultRouter()
-router.register("user", IncomeAPIView, basename="user-income")
+router.register(
+    "user",
+    AsyncIncomeAPIView if settings.API_MODE == "async" else IncomeAPIView,
+    basename="user-income"
+)
 
 app_name = "income"
 
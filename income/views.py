@@ -4,22 +4,38 @@ Views for Income API
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
+from expensetracker.async_views import AsyncModelViewSetMixin
+from expensetracker.mixins import (
+    BulkUpdateDestroyMixin, ConditionalRequestMixin, ListFilterMixin,
+    ReplicaReadMixin, TimeSeriesMixin, UserScopedMixin, ValuesListMixin
+)
+from ledger.mixins import ArchiveReadMixin, BalanceRollupMixin
+
 from .models import Income
 
 from .serializers import IncomeSerializer
 
 
-class IncomeAPIView(viewsets.ModelViewSet):
+class IncomeAPIView(
+    ReplicaReadMixin, ArchiveReadMixin, BalanceRollupMixin, UserScopedMixin,
+    ListFilterMixin, ConditionalRequestMixin, ValuesListMixin,
+    BulkUpdateDestroyMixin, TimeSeriesMixin, viewsets.ModelViewSet
+):
     """Operations about a user's income"""
     serializer_class = IncomeSerializer
     permission_classes = [IsAuthenticated]
     queryset = Income.objects.all()
+    amount_field = "amount"
+    rollup_kind = "income"
+    list_orderings = {
+        **ListFilterMixin.list_orderings,
+        "-amount": ("-amount", "-id"),
+        "amount": ("amount", "id"),
+    }
+
 
-    def get_queryset(self):
-        """Override queryset to filter for user"""
-        return self.queryset.filter(user=self.request.user)
+class AsyncIncomeAPIView(AsyncModelViewSetMixin, IncomeAPIView):
+    """IncomeAPIView with async reads, served when API_MODE is async"""
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
 
 # Create your views here.
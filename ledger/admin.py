@@ -0,0 +1,11 @@
+"""
+Register Model for Admin
+"""
+from django.contrib import admin
+
+from .models import ArchivedMonth, ArchivedTotal, MonthlyBalance
+
+
+admin.site.register(ArchivedMonth)
+admin.site.register(ArchivedTotal)
+admin.site.register(MonthlyBalance)
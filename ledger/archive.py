@@ -0,0 +1,158 @@
+"""
+Cold storage of old income and expenditure rows
+"""
+import zlib
+from collections import Counter
+from uuid import UUID
+
+import msgpack
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from expenditure.models import Expenditure
+from income.models import Income
+
+from .models import ArchivedMonth, ArchivedTotal, month_of
+
+# kind: (model, amount field, columns read through a relation). Rows keep
+# the names of their categories so they read back without the hot tables.
+ARCHIVES = {
+    "income": (Income, "amount", []),
+    "expenditure": (Expenditure, "estimated_amount", ["category__name"]),
+}
+# Column whose value is the group of ArchivedTotal.category
+TOTAL_GROUPS = {"expenditure": "category__name"}
+
+
+def archive_columns(kind):
+    """The plain columns of ``kind`` and the columns read through relations"""
+    model, _, related = ARCHIVES[kind]
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if not field.is_relation
+    ] + related
+
+
+def encode_rows(rows):
+    """
+    Pack row dicts column by column, which compresses much better than
+    row by row since the values of a column look alike
+    """
+    columns = {name: [row[name] for row in rows] for name in rows[0]}
+    columns["id"] = [pk.bytes for pk in columns["id"]]
+    return zlib.compress(
+        msgpack.packb(columns, datetime=True, use_bin_type=True), 9
+    )
+
+
+def decode_rows(payload):
+    columns = msgpack.unpackb(zlib.decompress(payload), timestamp=3)
+    columns["id"] = [UUID(bytes=pk) for pk in columns["id"]]
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def archive_batch(kind, cutoff, batch_size):
+    """
+    Move up to ``batch_size`` rows of ``kind`` created before ``cutoff``
+    into the archive in one transaction. Returns the number of rows moved.
+    """
+    model, amount_field, _ = ARCHIVES[kind]
+    columns = archive_columns(kind)
+    with transaction.atomic():
+        rows = list(
+            model.objects.filter(date_created__lt=cutoff)
+            .order_by("user_id", "date_created", "id")
+            .select_for_update(of=("self",))
+            .values("user_id", *columns)[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        months = {}
+        totals = Counter()
+        counts = Counter()
+        group = TOTAL_GROUPS.get(kind)
+        for row in rows:
+            user_id = row.pop("user_id")
+            moment = row["date_created"]
+            months.setdefault((user_id, month_of(moment)), []).append(row)
+            key = (
+                user_id, timezone.localtime(moment).date(),
+                row[group] if group else "",
+            )
+            totals[key] += row[amount_field]
+            counts[key] += 1
+
+        for (user_id, month), month_rows in months.items():
+            archived, _ = (
+                ArchivedMonth.objects.select_for_update().get_or_create(
+                    user_id=user_id, kind=kind, month=month,
+                    defaults={"payload": b""},
+                )
+            )
+            if archived.row_count:
+                month_rows = decode_rows(archived.payload) + month_rows
+            archived.payload = encode_rows(month_rows)
+            archived.row_count = len(month_rows)
+            archived.save()
+
+        for (user_id, day, category), total in totals.items():
+            changed = ArchivedTotal.objects.filter(
+                user_id=user_id, kind=kind, day=day, category=category
+            ).update(
+                total=F("total") + total,
+                count=F("count") + counts[user_id, day, category],
+            )
+            if not changed:
+                ArchivedTotal.objects.create(
+                    user_id=user_id, kind=kind, day=day, category=category,
+                    total=total, count=counts[user_id, day, category],
+                )
+
+        model.objects.filter(id__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_before(kind, cutoff, batch_size=10_000):
+    """
+    Move every row of ``kind`` created before ``cutoff``, batch after
+    batch, and return how many were moved. The monthly balances keep
+    counting archived rows.
+    """
+    moved = 0
+    while True:
+        count = archive_batch(kind, cutoff, batch_size)
+        if not count:
+            return moved
+        moved += count
+
+
+def archived_rows(user, kind, start=None, end=None, newest_first=True):
+    """
+    Archived rows of ``user`` created in ``[start, end)``, a month at a
+    time in date order: the caller stops decoding once it has enough.
+    """
+    months = ArchivedMonth.objects.filter(user=user, kind=kind)
+    if start is not None:
+        months = months.filter(month__gte=month_of(start))
+    if end is not None:
+        months = months.filter(month__lte=month_of(end))
+    months = months.order_by("-month" if newest_first else "month")
+    for payload in months.values_list("payload", flat=True).iterator():
+        rows = [
+            row for row in decode_rows(bytes(payload))
+            if (start is None or row["date_created"] >= start)
+            and (end is None or row["date_created"] < end)
+        ]
+        rows.sort(key=lambda row: row["date_created"], reverse=newest_first)
+        yield rows
+
+
+def archived_count(user, kind):
+    """Number of archived rows of ``user``"""
+    return sum(ArchivedMonth.objects.filter(
+        user=user, kind=kind
+    ).values_list("row_count", flat=True))
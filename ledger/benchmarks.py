@@ -0,0 +1,22 @@
+"""
+Benchmarks for the User's Ledger Endpoints
+"""
+from expensetracker.benchmarking import benchmark
+
+BALANCE_URL = "/ledger/balance/"
+SEARCH_URL = "/ledger/search/"
+
+
+@benchmark("ledger.balance")
+def balance(context):
+    return context.client.get(BALANCE_URL)
+
+
+@benchmark("ledger.search.word")
+def search_word(context):
+    return context.client.get(SEARCH_URL, {"q": "electricity"})
+
+
+@benchmark("ledger.search.prefix")
+def search_prefix(context):
+    return context.client.get(SEARCH_URL, {"q": "sal"})
@@ -0,0 +1,44 @@
+"""
+Move old income and expenditure rows into the compressed archive
+"""
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ledger.archive import ARCHIVES, archive_before
+from ledger.models import month_of
+from ledger.partitioning import add_months
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the income and expenditure rows created before the start of "
+        "the month --older-than months ago into the compressed monthly "
+        "archive. Archived rows stay in the balances and are read back "
+        "with archived=true. Run it monthly, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=24,
+            help="Archive rows older than this many months (default 24).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10_000,
+            help="Rows moved per transaction (default 10000).",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 1 or options["batch_size"] < 1:
+            raise CommandError(
+                "--older-than and --batch-size must be positive."
+            )
+        month = add_months(month_of(timezone.now()), -options["older_than"])
+        cutoff = timezone.make_aware(datetime.combine(month, time.min))
+        for kind in ARCHIVES:
+            moved = archive_before(kind, cutoff, options["batch_size"])
+            self.stdout.write(f"Archived {moved} {kind} rows.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Rows created before {cutoff:%Y-%m-%d} are archived."
+        ))
@@ -0,0 +1,168 @@
+"""
+Benchmark the API endpoints against seeded datasets of several sizes
+"""
+import json
+import multiprocessing
+import os
+import platform
+import sys
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+from django.utils import timezone
+
+from expensetracker.benchmarking import (
+    DATASETS, SEED_PASSWORD, compare, dataset_context, discover,
+    run_benchmark, seeded
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the benchmarks modules of the apps against seeded datasets in "
+        "a test database and report p50/p95/p99 latency, queries per "
+        "request and peak memory as JSON. With --baseline, fail when a "
+        "metric regressed by more than --threshold percent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--datasets", default="small,medium",
+            help=f"Comma separated datasets out of {', '.join(DATASETS)} "
+                 "(default small,medium).",
+        )
+        parser.add_argument(
+            "--only", action="append", default=[],
+            help="Only run benchmarks starting with this name, e.g. "
+                 "expenditure. (repeatable).",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=50,
+            help="Timed requests per benchmark (default 50).",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=5,
+            help="Untimed requests before timing (default 5).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON report to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON report of an earlier run to compare against.",
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=20.0,
+            help="Allowed regression in percent (default 20).",
+        )
+        parser.add_argument(
+            "--noise-ms", type=float, default=1.0,
+            help="Latency increases below this many milliseconds never "
+                 "count as regressions (default 1).",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Keep the test database and its datasets for later runs.",
+        )
+
+    def handle(self, *args, **options):
+        datasets = [
+            name.strip() for name in options["datasets"].split(",")
+            if name.strip()
+        ]
+        unknown = set(datasets) - set(DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown dataset(s): {', '.join(unknown)}.")
+        benchmarks = [
+            bench for name, bench in discover().items()
+            if not options["only"] or name.startswith(tuple(options["only"]))
+        ]
+        if not benchmarks:
+            raise CommandError("No benchmark matches --only.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)["results"]
+
+        verbosity = options["verbosity"]
+        setup_test_environment()
+        old_config = setup_databases(
+            verbosity, interactive=False, keepdb=options["keepdb"],
+            aliases={"default"}, serialized_aliases=set(),
+        )
+        try:
+            results = self.run_datasets(datasets, benchmarks, options)
+        finally:
+            teardown_databases(
+                old_config, verbosity, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        report = {"environment": self.environment(), "results": results}
+        if baseline is not None:
+            report["regressions"] = compare(
+                results, baseline, options["threshold"], options["noise_ms"]
+            )
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if report.get("regressions"):
+            for regression in report["regressions"]:
+                self.stderr.write(
+                    "{benchmark} [{dataset}] {metric}: {baseline} -> "
+                    "{value}".format(**regression)
+                )
+            raise CommandError(
+                f"{len(report['regressions'])} regression(s) above "
+                f"{options['threshold']}%."
+            )
+
+    def run_datasets(self, datasets, benchmarks, options):
+        # Seeding processes inherit the test database settings only when
+        # forked, anything else would write to the configured database
+        workers = (
+            os.cpu_count() if multiprocessing.get_start_method() == "fork"
+            else 1
+        )
+        results = []
+        for name in datasets:
+            users, rows, seed = DATASETS[name]
+            if not seeded(name):
+                call_command(
+                    "seed_ledger", users=users, rows=rows, seed=seed,
+                    password=SEED_PASSWORD, workers=workers,
+                    stdout=self.stderr,
+                )
+            context = dataset_context(name)
+            for bench in benchmarks:
+                if options["verbosity"] > 1:
+                    self.stderr.write(f"{bench.name} [{name}]")
+                try:
+                    results.append(run_benchmark(
+                        bench, context, options["iterations"],
+                        options["warmup"],
+                    ))
+                except RuntimeError as error:
+                    raise CommandError(str(error))
+        return results
+
+    def environment(self):
+        return {
+            "date": timezone.now().isoformat(),
+            "python": sys.version.split()[0],
+            "django": django.get_version(),
+            "database": f"{connection.vendor} {connection.Database.__name__}",
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        }
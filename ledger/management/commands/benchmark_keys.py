@@ -0,0 +1,81 @@
+"""
+Compare random (v4) and time ordered (v7) UUID primary keys on PostgreSQL
+"""
+import io
+import time
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from expensetracker.uuids import uuid7
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert the same number of rows into a scratch table keyed by UUIDv4 "
+        "and one keyed by UUIDv7, then report insert throughput and primary "
+        "key index size. PostgreSQL only."
+    )
+
+    generators = (("uuid4", uuid4), ("uuid7", uuid7))
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=10_000_000,
+            help="Rows inserted per key type (default 10,000,000).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=50_000,
+            help="Rows per COPY statement (default 50,000).",
+        )
+        parser.add_argument(
+            "--keep", action="store_true",
+            help="Keep the scratch tables for further inspection.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The key benchmark needs PostgreSQL.")
+        rows = options["rows"]
+        if rows < 1:
+            raise CommandError("--rows must be positive.")
+        batch_size = max(options["batch_size"], 1)
+
+        self.stdout.write(
+            f"{'key':<6} {'rows/s':>12} {'seconds':>9} "
+            f"{'index MB':>10} {'table MB':>10}"
+        )
+        for name, generate in self.generators:
+            table = f"benchmark_keys_{name}"
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(
+                    f"CREATE TABLE {table} ("
+                    "id uuid PRIMARY KEY, amount bigint NOT NULL)"
+                )
+                # Only the COPY is timed, not generating the keys
+                elapsed = 0.0
+                for offset in range(0, rows, batch_size):
+                    count = min(batch_size, rows - offset)
+                    data = io.StringIO("".join(
+                        f"{generate()}\t{offset + index}\n"
+                        for index in range(count)
+                    ))
+                    started = time.perf_counter()
+                    cursor.copy_expert(
+                        f"COPY {table} (id, amount) FROM STDIN", data
+                    )
+                    elapsed += time.perf_counter() - started
+                cursor.execute(
+                    "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+                    [f"{table}_pkey", table],
+                )
+                index_size, table_size = cursor.fetchone()
+                if not options["keep"]:
+                    cursor.execute(f"DROP TABLE {table}")
+
+            self.stdout.write(
+                f"{name:<6} {rows / elapsed:>12,.0f} {elapsed:>9.1f} "
+                f"{index_size / 2 ** 20:>10.1f} {table_size / 2 ** 20:>10.1f}"
+            )
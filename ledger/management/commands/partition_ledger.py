@@ -0,0 +1,65 @@
+"""
+Create upcoming monthly partitions of the ledger tables, detach old ones
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from ledger.partitioning import (
+    PARTITIONED_TABLES, is_partitioned, maintain_partitions
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the income and expenditure "
+        "tables for the current and the next months, and detach (or drop) "
+        "those older than the retention. Run it daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=3,
+            help="Months to create ahead of the current one (default 3).",
+        )
+        parser.add_argument(
+            "--retain", type=int,
+            help=(
+                "Detach partitions ending more than this many months "
+                "before the current one. Nothing is detached by default."
+            ),
+        )
+        parser.add_argument(
+            "--drop", action="store_true",
+            help="Drop the detached partitions instead of keeping them.",
+        )
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+            help="Database to maintain (default 'default').",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning needs PostgreSQL.")
+        if options["ahead"] < 0 or (options["retain"] or 0) < 0:
+            raise CommandError("--ahead and --retain cannot be negative.")
+        if options["drop"] and options["retain"] is None:
+            raise CommandError("--drop needs --retain.")
+
+        now = timezone.now()
+        for table in PARTITIONED_TABLES:
+            if not is_partitioned(connection, table):
+                raise CommandError(
+                    f"{table} is not partitioned, run the migrations first."
+                )
+            created, detached = maintain_partitions(
+                connection, table, now, options["ahead"],
+                options["retain"], options["drop"],
+            )
+            for name in created:
+                self.stdout.write(f"Created {name}.")
+            for name in detached:
+                verb = "Dropped" if options["drop"] else "Detached"
+                self.stdout.write(f"{verb} {name}.")
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date."))
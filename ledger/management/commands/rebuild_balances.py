@@ -0,0 +1,37 @@
+"""
+Recompute the monthly balance rollups from the ledger tables
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ledger.models import MonthlyBalance
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the monthly balance rollups from the income and "
+        "expenditure tables and the archived totals, e.g. after rows were "
+        "changed in the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email", action="append", dest="emails",
+            help="Only rebuild this user's rollups (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["emails"]:
+            user_ids = list(
+                get_user_model().objects
+                .filter(email__in=options["emails"])
+                .values_list("id", flat=True)
+            )
+            if len(user_ids) != len(set(options["emails"])):
+                raise CommandError("Unknown user email given.")
+
+        count = MonthlyBalance.objects.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {count} monthly balance(s)."
+        ))
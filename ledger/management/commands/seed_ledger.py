@@ -0,0 +1,136 @@
+"""
+Fill the database with synthetic users, income and expenditure
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from expensetracker.db.pool import close_pools
+from ledger.seed import (
+    chunk_users, seed_email_domain, seed_users, user_row_counts
+)
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic users with income and expenditure rows spread "
+        "over categories and dates, plus their monthly balances. The same "
+        "--seed, --until and sizes always give the same rows. Uses COPY on "
+        "PostgreSQL and runs on several processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=100,
+            help="Users to create (default 100).",
+        )
+        parser.add_argument(
+            "--rows", type=int, default=10_000,
+            help="Income and expenditure rows in total (default 10,000).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed of the generator, also part of the user emails "
+                 "(user<n>@seed<seed>.example.com).",
+        )
+        parser.add_argument(
+            "--until", default=None,
+            help="Date (YYYY-MM-DD) of the newest rows (default today).",
+        )
+        parser.add_argument(
+            "--days", type=int, default=365,
+            help="Days of history before --until (default 365).",
+        )
+        parser.add_argument(
+            "--password", default="seedpassword123",
+            help="Password of every seeded user.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count(),
+            help="Processes generating and inserting rows (default: one "
+                 "per CPU).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=50_000,
+            help="Rows per transaction (default 50,000).",
+        )
+        parser.add_argument(
+            "--clear", action="store_true",
+            help="Delete the users of this seed and their rows first.",
+        )
+
+    def handle(self, *args, **options):
+        users, rows, days = options["users"], options["rows"], options["days"]
+        if users < 1 or rows < 0 or days < 1:
+            raise CommandError(
+                "--users and --days must be positive, --rows not negative."
+            )
+        try:
+            until = datetime.strptime(
+                options["until"], "%Y-%m-%d"
+            ) if options["until"] else datetime.now()
+        except ValueError:
+            raise CommandError("--until must be a YYYY-MM-DD date.")
+        until = until.replace(
+            hour=0, minute=0, second=0, microsecond=0,
+            tzinfo=dt_timezone.utc,
+        )
+        seed = options["seed"]
+
+        seeded = User.objects.filter(email__endswith=seed_email_domain(seed))
+        if options["clear"]:
+            deleted, _ = seeded.delete()
+            self.stdout.write(f"Deleted {deleted} row(s) of seed {seed}.")
+        elif seeded.exists():
+            raise CommandError(
+                f"Seed {seed} was loaded before, pass --clear to replace it."
+            )
+
+        password = make_password(options["password"])
+        chunks = list(chunk_users(
+            user_row_counts(seed, users, rows), max(options["batch_size"], 1)
+        ))
+        started = time.perf_counter()
+        totals = {}
+        for written in self.run_chunks(
+            chunks, options["workers"],
+            seed=seed, password=password, until=until, days=days,
+        ):
+            for label, count in written.items():
+                totals[label] = totals.get(label, 0) + count
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {written}")
+        elapsed = time.perf_counter() - started
+
+        inserted = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded " + ", ".join(
+                f"{count} {label}" for label, count in sorted(totals.items())
+            ) + f" in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)."
+        ))
+
+    def run_chunks(self, chunks, workers, **params):
+        if workers <= 1 or len(chunks) == 1:
+            for first_index, counts in chunks:
+                yield seed_users(first_index, counts, **params)
+            return
+
+        # Children must open their own connections, not share ours
+        connections.close_all()
+        close_pools()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=django.setup
+        ) as executor:
+            futures = [
+                executor.submit(seed_users, first_index, counts, **params)
+                for first_index, counts in chunks
+            ]
+            for future in futures:
+                yield future.result()
@@ -0,0 +1,52 @@
+# Generated by Django 4.1.4 on 2026-10-18 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyBalance",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("income_total", models.BigIntegerField(default=0)),
+                ("income_count", models.IntegerField(default=0)),
+                ("expenditure_total", models.BigIntegerField(default=0)),
+                ("expenditure_count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="monthlybalance",
+            constraint=models.UniqueConstraint(
+                fields=("user", "month"), name="ledger_balance_user_month"
+            ),
+        ),
+    ]
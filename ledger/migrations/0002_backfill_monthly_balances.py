@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill(apps, schema_editor):
+    """Build the rollups of the rows that existed before the ledger app"""
+    MonthlyBalance = apps.get_model("ledger", "MonthlyBalance")
+    rollups = {}
+    for kind, model, amount_field in [
+        ("income", apps.get_model("income", "Income"), "amount"),
+        (
+            "expenditure",
+            apps.get_model("expenditure", "Expenditure"),
+            "estimated_amount",
+        ),
+    ]:
+        rows = (
+            model.objects.annotate(
+                month=TruncMonth(
+                    "date_created", output_field=models.DateField()
+                )
+            )
+            .values("user_id", "month")
+            .annotate(total=Sum(amount_field), count=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            key = (row["user_id"], row["month"])
+            rollup = rollups.setdefault(
+                key, MonthlyBalance(user_id=key[0], month=key[1])
+            )
+            setattr(rollup, f"{kind}_total", row["total"])
+            setattr(rollup, f"{kind}_count", row["count"])
+    MonthlyBalance.objects.bulk_create(rollups.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ledger", "0001_initial"),
+        ("income", "0001_initial"),
+        ("expenditure", "0002_expenditure_user_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
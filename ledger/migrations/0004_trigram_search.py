@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# (index, table, column)
+TRIGRAM_INDEXES = [
+    ("expenditure_item_trgm_idx", "expenditure_expenditure", "name_of_item"),
+    ("expenditure_category_trgm_idx", "expenditure_expenditure", "category"),
+    ("income_revenue_trgm_idx", "income_income", "name_of_revenue"),
+]
+
+
+def trigram_supported(schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def create_indexes(apps, schema_editor):
+    """
+    GIN trigram indexes for the search endpoint. Servers without the
+    contrib extensions keep the substring search without indexes.
+    """
+    if not trigram_supported(schema_editor):
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ledger", "0003_uuid7_ids"),
+        ("income", "0004_list_filter_idx"),
+        ("expenditure", "0005_list_filter_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+INDEX = "expenditure_category_name_trgm_idx"
+
+
+def create_index(apps, schema_editor):
+    """Trigram index on the category names that replace the column"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX} ON expenditure_category "
+        f"USING gin (name gin_trgm_ops)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ledger", "0004_trigram_search"),
+        ("expenditure", "0008_category_fk"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+
+from django.db import migrations, transaction
+
+TABLES = ["expenditure_expenditure", "income_income"]
+
+
+def next_boundary():
+    """Start of the month after next, later than any row written meanwhile"""
+    now = datetime.now(timezone.utc)
+    index = now.year * 12 + now.month + 1
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition(apps, schema_editor):
+    """
+    Turn the income and expenditure tables into tables partitioned by
+    month of ``date_created``, without copying a row: the existing table
+    becomes the ``_legacy`` partition of everything before the boundary,
+    a ``_default`` partition catches rows no monthly partition covers.
+    The ``partition_ledger`` command adds the monthly partitions.
+
+    The primary key becomes ``(id, date_created)`` as PostgreSQL requires
+    the partition key in unique constraints; ids are UUIDv7, unique
+    by construction.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    quote = connection.ops.quote_name
+    for table in TABLES:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(%s)", [table]
+            )
+            if cursor.fetchone() is not None:
+                continue
+        legacy = f"{table}_legacy"
+        boundary = next_boundary()
+
+        # Build and validate what the partition needs without blocking
+        # writes, so attaching it later neither builds nor scans
+        schema_editor.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+            f"{quote(f'{table}_id_created_uniq')} "
+            f"ON {quote(table)} (id, date_created)"
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT "
+            f"{quote(f'{legacy}_range')} CHECK (date_created < %s) NOT VALID",
+            [boundary],
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} VALIDATE CONSTRAINT "
+            f"{quote(f'{legacy}_range')}"
+        )
+
+        with transaction.atomic(using=connection.alias), \
+                connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE tablename = %s AND indexname NOT IN (%s, %s)",
+                [table, f"{table}_pkey", f"{table}_id_created_uniq"],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'", [table]
+            )
+            foreign_keys = cursor.fetchall()
+
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} DROP CONSTRAINT "
+                f"{quote(f'{table}_pkey')}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT "
+                f"{quote(f'{legacy}_pkey')} PRIMARY KEY USING INDEX "
+                f"{quote(f'{table}_id_created_uniq')}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} RENAME TO {quote(legacy)}"
+            )
+            for name, _ in indexes:
+                cursor.execute(
+                    f"ALTER INDEX {quote(name)} RENAME TO "
+                    f"{quote(f'{name}_legacy'[-63:])}"
+                )
+
+            cursor.execute(
+                f"CREATE TABLE {quote(table)} (LIKE {quote(legacy)} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE (date_created)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} DROP CONSTRAINT "
+                f"{quote(f'{legacy}_range')}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT "
+                f"{quote(f'{table}_pkey')} PRIMARY KEY (id, date_created)"
+            )
+            for name, definition in foreign_keys:
+                cursor.execute(
+                    f"ALTER TABLE {quote(table)} ADD CONSTRAINT "
+                    f"{quote(name)} {definition}"
+                )
+            for name, definition in indexes:
+                cursor.execute(definition)
+            # Takes over the matching indexes and constraints of the
+            # legacy table
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ATTACH PARTITION "
+                f"{quote(legacy)} FOR VALUES FROM (MINVALUE) TO (%s)",
+                [boundary],
+            )
+            cursor.execute(
+                f"CREATE TABLE {quote(f'{table}_default')} "
+                f"PARTITION OF {quote(table)} DEFAULT"
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("ledger", "0005_category_trigram_search"),
+        ("income", "0004_list_filter_idx"),
+        ("expenditure", "0008_category_fk"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.1.4 on 2026-10-18 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import expensetracker.uuids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("ledger", "0006_partition_ledger_tables"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("income", "Income"),
+                            ("expenditure", "Expenditure"),
+                        ],
+                        max_length=11,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("category", models.CharField(blank=True, max_length=255)),
+                ("total", models.BigIntegerField(default=0)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedMonth",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=expensetracker.uuids.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("income", "Income"),
+                            ("expenditure", "Expenditure"),
+                        ],
+                        max_length=11,
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("row_count", models.IntegerField(default=0)),
+                ("payload", models.BinaryField()),
+                ("date_modified", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="archivedtotal",
+            constraint=models.UniqueConstraint(
+                fields=("user", "kind", "day", "category"),
+                name="ledger_archived_total_day",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="archivedmonth",
+            constraint=models.UniqueConstraint(
+                fields=("user", "kind", "month"),
+                name="ledger_archive_user_kind_month",
+            ),
+        ),
+    ]
@@ -0,0 +1,248 @@
+"""
+Keep the monthly balance rollups in step with ledger writes, read
+archived rows back
+"""
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Max, Sum
+from django.http import Http404
+
+from rest_framework import serializers
+
+from expensetracker.pagination import sort_rows
+
+from .archive import archived_count, archived_rows
+from .models import ArchivedTotal, MonthlyBalance, month_of, monthly_totals
+from .serializers import ArchiveQuerySerializer
+
+
+class ArchiveReadMixin:
+    """
+    Read the rows moved to the archive (``ledger.archive``) back with
+    ``archived=true``. Lists merge the archived rows matching the list
+    filters into the keyset pages, decoding only the months a page
+    reaches when sorted by creation time; series add the daily archived
+    totals. Without it archived rows are left out, also of the list ETag.
+
+    Goes before ``BalanceRollupMixin``, whose counts include archived
+    rows, and expects ``ListFilterMixin``. Lists without a keyset
+    paginator merge every archived row in ``list_orderings`` order.
+    """
+    rollup_kind = None
+    # List filter name to the archived column it matches
+    archive_filter_columns = {}
+
+    def include_archived(self):
+        params = ArchiveQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data["archived"]
+
+    def get_list_state(self):
+        state = super().get_list_state()
+        if not self.include_archived():
+            state["count"] -= archived_count(
+                self.request.user, self.rollup_kind
+            )
+        return state
+
+    def get_values_list_fields(self):
+        fields = super().get_values_list_fields()
+        if fields is None and self.include_archived():
+            # Archived rows only exist as plain column values
+            raise serializers.ValidationError({"archived": [
+                "Archived rows cannot be listed here."
+            ]})
+        return fields
+
+    def fetch_values_list(self, queryset, fields):
+        if not self.include_archived():
+            return super().fetch_values_list(queryset, fields)
+        columns = [column for _, column, _ in fields]
+        if self.paginator is not None:
+            return self.paginator.paginate_values_list(
+                queryset, columns, self.request,
+                view=self, extra_rows=self.get_archived_batches,
+            )
+
+        # Unpaginated lists hold every row, archived ones included
+        ordering = self.list_orderings[self.list_filters.get(
+            "ordering", next(iter(self.list_orderings))
+        )]
+        names = [name.lstrip("-") for name in ordering]
+        selected = [*columns, *(name for name in names if name not in columns)]
+        positions = [selected.index(name) for name in names]
+        rows = list(queryset.values_list(*selected)) + [
+            tuple(row[name] for name in selected)
+            for batch in self.get_archived_batches(ordering) for row in batch
+        ]
+        rows = sort_rows(
+            rows, ordering, lambda row: [row[index] for index in positions]
+        )
+        return [row[:len(columns)] for row in rows]
+
+    def get_archived_batches(self, ordering, position=None):
+        """
+        The archived rows matching the list filters, a month at a time
+        in the order of the page when sorted by creation time, all in one
+        batch otherwise. A page cursor ``position`` skips the months
+        before it in that order.
+        """
+        filters = self.list_filters
+        start = filters.get("created_after")
+        end = filters.get("created_before")
+        by_date = ordering[0].lstrip("-") == "date_created"
+        newest_first = ordering[0].startswith("-")
+        if by_date and position is not None:
+            # Rows created at the cursor time sort after it by their id
+            if newest_first:
+                bound = position[0] + timedelta(microseconds=1)
+                end = bound if end is None else min(end, bound)
+            else:
+                bound = position[0]
+                start = bound if start is None else max(start, bound)
+        batches = (
+            [row for row in rows if self.archived_row_matches(row, filters)]
+            for rows in archived_rows(
+                self.request.user, self.rollup_kind, start, end,
+                newest_first=newest_first,
+            )
+        )
+        if by_date:
+            return batches
+        return [list(chain.from_iterable(batches))]
+
+    def archived_row_matches(self, row, filters):
+        for name in self.list_filter_fields:
+            column = self.archive_filter_columns.get(name, name)
+            if filters.get(name) and row[column] not in filters[name]:
+                return False
+        amount = row[self.amount_field]
+        minimum = filters.get(f"{self.amount_field}_min")
+        maximum = filters.get(f"{self.amount_field}_max")
+        return (
+            (minimum is None or amount >= minimum)
+            and (maximum is None or amount <= maximum)
+        )
+
+    def get_extra_series(self, params, truncate, group):
+        """The archived totals per bucket, kept per day of TIME_ZONE"""
+        extra = super().get_extra_series(params, truncate, group)
+        if not self.include_archived():
+            return extra
+        if str(params["tz"]) != settings.TIME_ZONE:
+            raise serializers.ValidationError({"tz": [
+                f"Archived totals are only available in {settings.TIME_ZONE}."
+            ]})
+        totals = ArchivedTotal.objects.filter(
+            user=self.request.user, kind=self.rollup_kind
+        )
+        if "start" in params:
+            totals = totals.filter(day__gte=params["start"])
+        if "end" in params:
+            totals = totals.filter(day__lte=params["end"])
+        rows = (
+            totals
+            .annotate(period=truncate("day", output_field=models.DateField()))
+            .values("period", *group)
+            .annotate(total=Sum("total"), count=Sum("count"))
+            .order_by("period", *group)
+        )
+        return [*extra, *rows]
+
+
+class BalanceRollupMixin:
+    """
+    Apply the change of every create, update and delete of the viewset to
+    ``MonthlyBalance`` in the same transaction, as ``F()`` deltas.
+
+    Expects ``rollup_kind`` ("income" or "expenditure") and the
+    ``amount_field`` that is being summed.
+    """
+    rollup_kind = None
+    amount_field = None
+
+    def get_list_state(self):
+        """
+        Take the row count from the rollups rather than counting rows;
+        the latest ``date_modified`` is a single index lookup.
+        """
+        count = MonthlyBalance.objects.filter(
+            user=self.request.user
+        ).aggregate(count=Sum(f"{self.rollup_kind}_count"))["count"]
+        last_modified = self.get_queryset().aggregate(
+            last_modified=Max("date_modified")
+        )["last_modified"]
+        return {"count": count or 0, "last_modified": last_modified}
+
+    def add_to_rollup(self, month, amount=0, count=0):
+        MonthlyBalance.objects.add(
+            self.request.user.pk, month, self.rollup_kind, amount, count
+        )
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        instance = serializer.instance
+        self.add_to_rollup(
+            month_of(instance.date_created),
+            getattr(instance, self.amount_field), 1
+        )
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        old_amount = self.get_locked_amount(instance)
+        super().perform_update(serializer)
+        self.add_to_rollup(
+            month_of(instance.date_created),
+            getattr(instance, self.amount_field) - old_amount
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        amount = self.get_locked_amount(instance)
+        super().perform_destroy(instance)
+        self.add_to_rollup(month_of(instance.date_created), -amount, -1)
+
+    def get_locked_amount(self, instance):
+        """Lock the row and read the amount the rollup currently holds"""
+        try:
+            return (
+                type(instance).objects.select_for_update()
+                .values_list(self.amount_field, flat=True)
+                .get(pk=instance.pk)
+            )
+        except type(instance).DoesNotExist:
+            raise Http404
+
+    def perform_bulk_create(self, serializer):
+        super().perform_bulk_create(serializer)
+        months = {}
+        for instance in serializer.instance:
+            month = month_of(instance.date_created)
+            total, count = months.get(month, (0, 0))
+            months[month] = (
+                total + getattr(instance, self.amount_field), count + 1
+            )
+        for month, (total, count) in months.items():
+            self.add_to_rollup(month, total, count)
+
+    def perform_bulk_update(self, queryset, changes):
+        if self.amount_field not in changes:
+            return super().perform_bulk_update(queryset, changes)
+        before = list(monthly_totals(queryset, self.amount_field))
+        super().perform_bulk_update(queryset, changes)
+        for row in before:
+            self.add_to_rollup(
+                row["month"],
+                changes[self.amount_field] * row["count"] - row["total"]
+            )
+
+    def perform_bulk_destroy(self, queryset):
+        before = list(monthly_totals(queryset, self.amount_field))
+        super().perform_bulk_destroy(queryset)
+        for row in before:
+            self.add_to_rollup(row["month"], -row["total"], -row["count"])
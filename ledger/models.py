@@ -0,0 +1,214 @@
+"""
+Models for the user's ledger rollups
+"""
+from django.db import (
+    IntegrityError, connections, models, router, transaction
+)
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from expenditure.models import Expenditure
+from expensetracker.uuids import uuid7
+from income.models import Income
+from user.models import User
+
+
+def month_of(value):
+    """First day of the month ``value`` falls in, in the current time zone"""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def monthly_totals(queryset, amount_field, *fields):
+    """Sum and count the rows of ``queryset`` per month in SQL"""
+    return (
+        queryset
+        .annotate(month=TruncMonth(
+            "date_created", output_field=models.DateField()
+        ))
+        .values(*fields, "month")
+        .annotate(total=Sum(amount_field), count=Count("id"))
+        .order_by()
+    )
+
+
+class MonthlyBalanceManager(models.Manager):
+    """Apply incremental changes to the monthly rollups"""
+
+    def add(self, user_id, month, kind, amount=0, count=0):
+        """
+        Add ``amount`` and ``count`` to the ``kind`` ("income" or
+        "expenditure") totals of a month with an ``F()`` expression, so
+        concurrent writers never overwrite each other.
+        """
+        if not amount and not count:
+            return
+        rollup = self.filter(user_id=user_id, month=month)
+        changes = {
+            f"{kind}_total": F(f"{kind}_total") + amount,
+            f"{kind}_count": F(f"{kind}_count") + count,
+        }
+        if rollup.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, month=month, **{
+                    f"{kind}_total": amount,
+                    f"{kind}_count": count,
+                })
+        except IntegrityError:
+            # Another transaction created the month in the meantime
+            rollup.update(**changes)
+
+    def rebuild(self, user_ids=None):
+        """
+        Recompute the rollups from the income and expenditure tables and
+        the archived totals, either for every user or only for
+        ``user_ids``. The rollups are locked before the first read and until
+        the rewrite, so no delta committed meanwhile gets lost.
+        """
+        rollups = {}
+
+        def add(kind, user_id, month, total, count):
+            rollup = rollups.setdefault(
+                (user_id, month), self.model(user_id=user_id, month=month)
+            )
+            setattr(rollup, f"{kind}_total", getattr(
+                rollup, f"{kind}_total"
+            ) + total)
+            setattr(rollup, f"{kind}_count", getattr(
+                rollup, f"{kind}_count"
+            ) + count)
+
+        using = router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            stale = self.using(using)
+            if user_ids is not None:
+                stale = stale.filter(user_id__in=user_ids)
+            self.lock(using)
+            stale.delete()
+
+            for kind, model, amount_field in [
+                ("income", Income, "amount"),
+                ("expenditure", Expenditure, "estimated_amount"),
+            ]:
+                queryset = model.objects.using(using)
+                if user_ids is not None:
+                    queryset = queryset.filter(user_id__in=user_ids)
+                for row in monthly_totals(queryset, amount_field, "user_id"):
+                    add(
+                        kind, row["user_id"], row["month"],
+                        row["total"], row["count"],
+                    )
+
+            archived = ArchivedTotal.objects.using(using)
+            if user_ids is not None:
+                archived = archived.filter(user_id__in=user_ids)
+            for row in archived.values_list(
+                "kind", "user_id", "day", "total", "count"
+            ).iterator():
+                kind, user_id, day, total, count = row
+                add(kind, user_id, day.replace(day=1), total, count)
+
+            self.using(using).bulk_create(rollups.values(), batch_size=1000)
+        return len(rollups)
+
+    def lock(self, using):
+        """
+        Block rollup writers until the transaction ends. Writers change
+        the ledger tables before their rollup, so once the lock is held
+        every delta is either committed or waits for the rebuild. Other
+        databases rely on the delete that follows, which takes the write
+        lock on SQLite.
+        """
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"
+                )
+
+
+class MonthlyBalance(models.Model):
+    """Income and expenditure totals of a user for one month"""
+    id = models.UUIDField(
+        primary_key=True,
+        unique=True, db_index=True,
+        default=uuid7, editable=False
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    month = models.DateField()
+    income_total = models.BigIntegerField(default=0)
+    income_count = models.IntegerField(default=0)
+    expenditure_total = models.BigIntegerField(default=0)
+    expenditure_count = models.IntegerField(default=0)
+
+    objects = MonthlyBalanceManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month"], name="ledger_balance_user_month"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} {self.month:%Y-%m}"
+
+
+LEDGER_KINDS = [("income", "Income"), ("expenditure", "Expenditure")]
+
+
+class ArchivedMonth(models.Model):
+    """
+    Income or expenditure rows of a user's month moved out of the hot
+    table, see ``ledger.archive``
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        unique=True, db_index=True,
+        default=uuid7, editable=False
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=11, choices=LEDGER_KINDS)
+    month = models.DateField()
+    row_count = models.IntegerField(default=0)
+    # zlib compressed MessagePack map of column name to column values
+    payload = models.BinaryField()
+    date_modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "kind", "month"],
+                name="ledger_archive_user_kind_month",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} {self.kind} {self.month:%Y-%m}"
+
+
+class ArchivedTotal(models.Model):
+    """
+    Totals of the archived rows of a user per day (in the default time
+    zone) and, for expenditure, category
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=11, choices=LEDGER_KINDS)
+    day = models.DateField()
+    category = models.CharField(max_length=255, blank=True)
+    total = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "kind", "day", "category"],
+                name="ledger_archived_total_day",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} {self.kind} {self.day}"
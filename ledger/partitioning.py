@@ -0,0 +1,165 @@
+"""
+Monthly range partitions of the income and expenditure tables on PostgreSQL
+"""
+import re
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+PARTITIONED_TABLES = ["expenditure_expenditure", "income_income"]
+PARTITION_KEY = "date_created"
+
+_bound = re.compile(r"FROM \((MINVALUE|'[^']*')\) TO \((MAXVALUE|'[^']*')\)")
+
+
+def month_start(moment):
+    """First instant (UTC) of the month of ``moment``"""
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s)", [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def has_default_partition(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT partdefid <> 0 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s)", [table]
+        )
+        row = cursor.fetchone()
+        return row is not None and row[0]
+
+
+def _parse_bound(value):
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return parse_datetime(value.strip("'"))
+
+
+def partitions(connection, table):
+    """
+    ``(name, start, end)`` of the range partitions of ``table`` by start,
+    None for an unbounded side. The default partition is left out.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)", [table]
+        )
+        rows = cursor.fetchall()
+    ranges = []
+    for name, bound in rows:
+        match = _bound.search(bound)
+        if match:
+            ranges.append((
+                name, _parse_bound(match[1]), _parse_bound(match[2])
+            ))
+    return sorted(
+        ranges,
+        key=lambda row: row[1] or datetime.min.replace(tzinfo=timezone.utc),
+    )
+
+
+def create_partition(connection, table, month):
+    """
+    Add the partition of ``month`` to ``table``. Rows of that month that
+    went to the default partition meanwhile are moved into it.
+    """
+    name = partition_name(table, month)
+    quote = connection.ops.quote_name
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} (LIKE {quote(table)} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            default = quote(f"{table}_default")
+            where = f"{PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s"
+            cursor.execute(
+                f"INSERT INTO {quote(name)} "
+                f"SELECT * FROM {default} WHERE {where}", bounds
+            )
+            cursor.execute(f"DELETE FROM {default} WHERE {where}", bounds)
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ATTACH PARTITION "
+                f"{quote(name)} FOR VALUES FROM (%s) TO (%s)", bounds
+            )
+    return name
+
+
+def detach_partition(connection, table, name, drop=False):
+    """
+    Take ``name`` out of ``table``. Detached partitions stay as plain
+    tables, out of every query on ``table``, unless ``drop`` is set.
+    """
+    quote = connection.ops.quote_name
+    # Only blocks queries on the table from PostgreSQL 14 on; cannot run
+    # in a transaction nor on a table with a default partition, which the
+    # ledger tables have unless it was dropped by hand
+    concurrently = (
+        " CONCURRENTLY"
+        if connection.pg_version >= 140000
+        and connection.get_autocommit()
+        and not has_default_partition(connection, table)
+        else ""
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} DETACH PARTITION "
+            f"{quote(name)}{concurrently}"
+        )
+        if drop:
+            cursor.execute(f"DROP TABLE {quote(name)}")
+
+
+def maintain_partitions(connection, table, now, ahead, retain=None,
+                        drop=False):
+    """
+    Make sure ``table`` has partitions for the current month and the
+    ``ahead`` next ones, and for the months in between the last existing
+    partition and the current month, whose rows wait in the default
+    partition. Detach those that end more than ``retain`` months before
+    the current one. Returns the created and detached partition names.
+    """
+    current = month_start(now)
+    existing = partitions(connection, table)
+    covered_until = max(
+        (end for _, _, end in existing if end is not None), default=None
+    )
+    month = current if covered_until is None else min(covered_until, current)
+    last = add_months(current, ahead)
+    created = []
+    while month <= last:
+        if covered_until is None or month >= covered_until:
+            name = create_partition(connection, table, month)
+            created.append(name)
+            existing.append((name, month, add_months(month, 1)))
+        month = add_months(month, 1)
+
+    detached = []
+    if retain is not None:
+        cutoff = add_months(current, -retain)
+        for name, _, end in existing:
+            if end is not None and end <= cutoff:
+                detach_partition(connection, table, name, drop)
+                detached.append(name)
+    return created, detached
@@ -0,0 +1,130 @@
+"""
+Ranked search over the names of a user's income and expenditure
+"""
+import base64
+import binascii
+import json
+from uuid import UUID
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import models
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Round
+
+from expenditure.models import Expenditure
+from income.models import Income
+
+# kind: (model, searched fields, returned fields), fields following a
+# relation are returned under the name of the relation
+SEARCH_TARGETS = {
+    "expenditure": (
+        Expenditure, ["name_of_item", "category__name"],
+        ["id", "category__name", "name_of_item", "estimated_amount"],
+    ),
+    "income": (
+        Income, ["name_of_revenue"], ["id", "name_of_revenue", "amount"],
+    ),
+}
+
+# Scores are compared as integers in the cursor, floats would not round
+# trip exactly
+SCORE_SCALE = 1000
+
+_trigram_aliases = {}
+
+
+def trigram_available(connection):
+    """Whether the pg_trgm extension is installed in this database"""
+    if connection.alias not in _trigram_aliases:
+        available = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+                )
+                available = cursor.fetchone() is not None
+        _trigram_aliases[connection.alias] = available
+    return _trigram_aliases[connection.alias]
+
+
+def similarity(query, field, trigram):
+    """
+    How well ``query`` matches ``field`` from 0 to 1: the pg_trgm word
+    similarity, or without pg_trgm 1 for the whole value, 0.8 for a
+    prefix and 0.6 for any other substring
+    """
+    if trigram:
+        return TrigramWordSimilarity(query, field)
+    return Case(
+        When(**{f"{field}__iexact": query}, then=Value(1.0)),
+        When(**{f"{field}__istartswith": query}, then=Value(0.8)),
+        When(**{f"{field}__icontains": query}, then=Value(0.6)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def search_kind(kind, user, query, limit, position=None, trigram=False):
+    """
+    Up to ``limit`` rows of ``kind`` matching ``query``, best first, after
+    the cursor ``position`` (score, id). Rows carry ``kind`` and an
+    integer ``score`` out of SCORE_SCALE.
+    """
+    model, fields, returned = SEARCH_TARGETS[kind]
+    lookup = "trigram_word_similar" if trigram else "icontains"
+    matches = Q()
+    for field in fields:
+        matches |= Q(**{f"{field}__{lookup}": query})
+    scores = [similarity(query, field, trigram) for field in fields]
+    score = Greatest(*scores) if len(scores) > 1 else scores[0]
+
+    queryset = (
+        model.objects.filter(matches, user=user)
+        .annotate(score=Cast(
+            Round(score * SCORE_SCALE), output_field=models.IntegerField()
+        ))
+    )
+    if position is not None:
+        score, pk = position
+        queryset = queryset.filter(
+            Q(score__lt=score) | Q(score=score, id__lt=pk)
+        )
+    rows = queryset.order_by("-score", "-id").values(*returned, "score")
+    return [
+        {"kind": kind, **{
+            name.split("__")[0]: value for name, value in row.items()
+        }}
+        for row in rows[:limit]
+    ]
+
+
+def search(user, query, kinds, page_size, position=None, trigram=False):
+    """
+    One page of results over ``kinds``, merged by score and id, and
+    whether there are more
+    """
+    rows = []
+    for kind in kinds:
+        rows.extend(search_kind(
+            kind, user, query, page_size + 1, position, trigram
+        ))
+    rows.sort(key=lambda row: (row["score"], row["id"]), reverse=True)
+    return rows[:page_size], len(rows) > page_size
+
+
+def encode_cursor(row):
+    payload = json.dumps([row["score"], str(row["id"])])
+    return base64.urlsafe_b64encode(payload.encode("ascii")).decode()
+
+
+def decode_cursor(encoded):
+    """The (score, id) position of a cursor, ValueError when malformed"""
+    try:
+        score, pk = json.loads(
+            base64.urlsafe_b64decode(encoded.encode("ascii"))
+        )
+        if not isinstance(score, int):
+            raise ValueError(score)
+        return score, UUID(pk)
+    except (AttributeError, TypeError, UnicodeError, binascii.Error) as exc:
+        raise ValueError(encoded) from exc
@@ -0,0 +1,270 @@
+"""
+Reproducible synthetic users, income and expenditure for benchmarking
+"""
+import io
+import random
+from datetime import datetime
+from itertools import accumulate
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from expenditure.models import Category, Expenditure
+from expensetracker.uuids import uuid7
+from income.models import Income
+from ledger.models import MonthlyBalance
+from user.models import User
+
+# (category, share of expenditure rows, typical amount, item names)
+EXPENDITURE_CATEGORIES = [
+    ("groceries", 0.26, 45, ["supermarket", "bakery", "market", "butcher"]),
+    ("transport", 0.18, 12, ["bus", "train", "taxi", "fuel", "parking"]),
+    ("dining", 0.14, 25, ["restaurant", "coffee", "takeaway", "lunch"]),
+    ("shopping", 0.10, 60, ["clothes", "electronics", "books", "furniture"]),
+    ("entertainment", 0.08, 30, ["cinema", "concert", "streaming", "games"]),
+    ("utilities", 0.07, 90, ["electricity", "water", "internet", "phone"]),
+    ("health", 0.06, 50, ["pharmacy", "doctor", "gym", "dentist"]),
+    ("rent", 0.04, 900, ["rent"]),
+    ("travel", 0.04, 400, ["flight", "hotel", "car rental"]),
+    ("education", 0.03, 120, ["course", "tuition", "stationery"]),
+]
+
+# (name of revenue, share of income rows, typical amount)
+INCOME_SOURCES = [
+    ("salary", 0.55, 3000),
+    ("freelance", 0.20, 500),
+    ("interest", 0.10, 20),
+    ("refund", 0.10, 40),
+    ("bonus", 0.05, 1500),
+]
+
+FIRST_NAMES = ["Ada", "Amara", "Chen", "Ivan", "Lena", "Musa", "Noor", "Sam"]
+LAST_NAMES = ["Adeyemi", "Garcia", "Ito", "Khan", "Novak", "Okafor", "Smith"]
+
+
+def seed_email(seed, index):
+    return f"user{index}@seed{seed}.example.com"
+
+
+def seed_email_domain(seed):
+    return f"@seed{seed}.example.com"
+
+
+def user_row_counts(seed, users, rows):
+    """
+    Split ``rows`` between ``users`` with a long tailed (log-normal)
+    distribution: most users have a few rows, some have many.
+    """
+    rng = random.Random(f"{seed}-weights")
+    weights = list(accumulate(rng.lognormvariate(0, 1) for _ in range(users)))
+    total = weights[-1]
+    cumulative = [round(rows * weight / total) for weight in weights]
+    return [
+        count - previous
+        for previous, count in zip([0] + cumulative, cumulative)
+    ]
+
+
+def _key(rng, moment):
+    return uuid7(int(moment.timestamp() * 1000), rng.getrandbits(74))
+
+
+def generate_user(seed, index, rows, password, until, days):
+    """
+    The user ``index`` of ``seed`` with ``rows`` income and expenditure
+    rows and their monthly rollups, as column values by model.
+
+    Everything is drawn from a generator seeded with ``seed`` and
+    ``index``, so a user comes out the same whatever process makes it.
+    """
+    rng = random.Random(f"{seed}-{index}")
+    # Rollup months are in the current time zone, like ledger.models.month_of
+    zone = timezone.get_current_timezone()
+    end = until.timestamp()
+    start = end - days * 86400
+    joined = start + rng.random() * (end - start) / 2
+    scale = rng.lognormvariate(0, 0.4)
+
+    user = {
+        "id": _key(rng, datetime.fromtimestamp(joined, zone)),
+        "password": password,
+        "last_login": None,
+        "is_superuser": False,
+        "email": seed_email(seed, index),
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": rng.choice(LAST_NAMES),
+        "username": f"user{index}",
+        "is_active": True,
+        "is_staff": False,
+    }
+
+    # Per user preferences on top of the population shares
+    category_weights = list(accumulate(
+        share * rng.lognormvariate(0, 0.5)
+        for _, share, _, _ in EXPENDITURE_CATEGORIES
+    ))
+    source_weights = list(accumulate(
+        share * rng.lognormvariate(0, 0.5) for _, share, _ in INCOME_SOURCES
+    ))
+    income_rows = round(rows * rng.uniform(0.08, 0.2))
+
+    rollups = {}
+    incomes = []
+    expenditures = []
+    for number in range(rows):
+        moment = datetime.fromtimestamp(
+            joined + rng.random() * (end - joined), zone
+        )
+        if number < income_rows:
+            name, _, typical = rng.choices(
+                INCOME_SOURCES, cum_weights=source_weights
+            )[0]
+            amount = max(1, round(
+                typical * scale * rng.lognormvariate(0, 0.3)
+            ))
+            incomes.append({
+                "id": _key(rng, moment),
+                "date_created": moment,
+                "date_modified": moment,
+                "user_id": user["id"],
+                "name_of_revenue": name,
+                "amount": amount,
+            })
+            kind = "income"
+        else:
+            category, _, typical, items = rng.choices(
+                EXPENDITURE_CATEGORIES, cum_weights=category_weights
+            )[0]
+            amount = max(1, round(
+                typical * scale * rng.lognormvariate(0, 0.6)
+            ))
+            expenditures.append({
+                "id": _key(rng, moment),
+                "date_created": moment,
+                "date_modified": moment,
+                "user_id": user["id"],
+                "category": category,
+                "name_of_item": rng.choice(items),
+                "estimated_amount": amount,
+            })
+            kind = "expenditure"
+
+        month = moment.date().replace(day=1)
+        rollup = rollups.get(month)
+        if rollup is None:
+            rollup = rollups[month] = {
+                "id": _key(rng, moment),
+                "user_id": user["id"],
+                "month": month,
+                "income_total": 0,
+                "income_count": 0,
+                "expenditure_total": 0,
+                "expenditure_count": 0,
+            }
+        rollup[f"{kind}_total"] += amount
+        rollup[f"{kind}_count"] += 1
+
+    return {
+        User: [user],
+        Category: [
+            {"user_id": user["id"], "name": name}
+            for name in sorted({row["category"] for row in expenditures})
+        ],
+        Income: incomes,
+        Expenditure: expenditures,
+        MonthlyBalance: list(rollups.values()),
+    }
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if value is True or value is False:
+        return "t" if value else "f"
+    if isinstance(value, str):
+        return (
+            value.replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r")
+        )
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def write_rows(model, rows):
+    """
+    Insert ``rows`` (dicts of column values by attribute name) with COPY on
+    PostgreSQL and a batched INSERT elsewhere, skipping the model layer.
+    """
+    if not rows:
+        return
+    fields = [model._meta.get_field(name) for name in rows[0]]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ", ".join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            data = io.StringIO("".join(
+                "\t".join(_copy_value(value) for value in row.values()) + "\n"
+                for row in rows
+            ))
+            cursor.copy_expert(
+                f"COPY {table} ({columns}) FROM STDIN", data
+            )
+        else:
+            placeholders = ", ".join(["%s"] * len(fields))
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                [
+                    [
+                        field.get_db_prep_save(value, connection)
+                        for field, value in zip(fields, row.values())
+                    ]
+                    for row in rows
+                ],
+            )
+
+
+def seed_users(first_index, counts, seed, password, until, days):
+    """
+    Generate and insert the users ``first_index`` onwards, one per entry
+    of ``counts``, in one transaction. Returns the rows written by model.
+    """
+    batch = {}
+    for index, rows in enumerate(counts, start=first_index):
+        for model, values in generate_user(
+            seed, index, rows, password, until, days
+        ).items():
+            batch.setdefault(model, []).extend(values)
+    with transaction.atomic():
+        for model, rows in batch.items():
+            if model is Expenditure:
+                # Category keys are only known once they are inserted
+                categories = {
+                    (user_id, name): pk
+                    for user_id, name, pk in Category.objects.filter(
+                        user_id__in={row["user_id"] for row in rows}
+                    ).values_list("user_id", "name", "id")
+                }
+                for row in rows:
+                    row["category"] = categories[
+                        row["user_id"], row["category"]
+                    ]
+            write_rows(model, rows)
+    return {model._meta.label: len(rows) for model, rows in batch.items()}
+
+
+def chunk_users(counts, batch_size):
+    """
+    Split the users into runs of consecutive users with about
+    ``batch_size`` rows each, as (first index, row counts) pairs.
+    """
+    chunk, rows, first_index = [], 0, 0
+    for index, count in enumerate(counts):
+        if chunk and rows + count > batch_size:
+            yield first_index, chunk
+            chunk, rows, first_index = [], 0, index
+        chunk.append(count)
+        rows += count
+    if chunk:
+        yield first_index, chunk
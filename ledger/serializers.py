@@ -0,0 +1,47 @@
+"""
+Serializers for the ledger rollups
+"""
+from rest_framework import serializers
+
+from expensetracker.timing import TimedSerializerMixin
+
+from .models import MonthlyBalance
+from .search import SEARCH_TARGETS
+
+
+class MonthlyBalanceSerializer(serializers.ModelSerializer):
+    """Serializer for one month of a user's balance"""
+    balance = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = MonthlyBalance
+        fields = [
+            "month", "income_total", "income_count",
+            "expenditure_total", "expenditure_count", "balance"
+        ]
+        read_only_fields = fields
+
+
+class BalanceSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for a user's overall balance"""
+    income_total = serializers.IntegerField()
+    expenditure_total = serializers.IntegerField()
+    balance = serializers.IntegerField()
+    months = MonthlyBalanceSerializer(many=True)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """Query parameters of the search endpoint"""
+    q = serializers.CharField(max_length=100)
+    kind = serializers.ChoiceField(
+        choices=list(SEARCH_TARGETS), required=False
+    )
+    page_size = serializers.IntegerField(
+        min_value=1, max_value=100, default=20
+    )
+    cursor = serializers.CharField(required=False)
+
+
+class ArchiveQuerySerializer(serializers.Serializer):
+    """Query parameter reading archived rows along the hot ones"""
+    archived = serializers.BooleanField(default=False)
@@ -0,0 +1,780 @@
+"""
+Test cases for the User's Ledger Endpoints
+"""
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from expenditure.models import Category, Expenditure
+from income.models import Income
+from ledger.archive import archive_before, archived_rows, decode_rows
+from ledger.models import ArchivedMonth, ArchivedTotal, MonthlyBalance
+from ledger.partitioning import (
+    PARTITIONED_TABLES, add_months, maintain_partitions, month_start,
+    partition_name, partitions
+)
+from ledger.search import trigram_available
+
+BALANCE_URL = "/ledger/balance/"
+SEARCH_URL = "/ledger/search/"
+EXPENDITURE_URL = "/expenditure/user/"
+INCOME_URL = "/income/user/"
+
+
+def create_user(**params):
+    """Signup and return a new user"""
+    return get_user_model().objects.create_user(**params)
+
+
+class BalanceAPITests(TestCase):
+    """Monthly balance rollup Tests"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        payload = {
+            "email": "test@example.com",
+            "password": "testpasswd123",
+        }
+        self.user = create_user(**payload)
+        self.client.force_authenticate(self.user)
+
+    def add_income(self, amount):
+        return self.client.post(
+            "/income/user/", {"name_of_revenue": "salary", "amount": amount}
+        )
+
+    def add_expense(self, amount):
+        return self.client.post("/expenditure/user/", {
+            "category": "transport",
+            "name_of_item": "transport",
+            "estimated_amount": amount
+        })
+
+    def assertBalance(self, income, expenditure):
+        response = self.client.get(BALANCE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["income_total"], income)
+        self.assertEqual(response.data["expenditure_total"], expenditure)
+        self.assertEqual(response.data["balance"], income - expenditure)
+        return response
+
+    def test_balance_without_data(self):
+        """A new user has a zero balance"""
+
+        response = self.assertBalance(0, 0)
+        self.assertEqual(response.data["months"], [])
+
+    def test_balance_follows_creates(self):
+        """Every created record is added to the month"""
+
+        self.add_income(1000)
+        self.add_expense(300)
+        self.add_expense(200)
+
+        response = self.assertBalance(1000, 500)
+        month = response.data["months"][0]
+        self.assertEqual(month["income_count"], 1)
+        self.assertEqual(month["expenditure_count"], 2)
+
+    def test_balance_follows_updates_and_deletes(self):
+        """Updates apply the difference, deletes remove the record"""
+
+        income = self.add_income(1000)
+        expense = self.add_expense(300)
+
+        self.client.patch(
+            "/income/user/{}/".format(income.data["id"]), {"amount": 1500}
+        )
+        self.client.delete(
+            "/expenditure/user/{}/".format(expense.data["id"])
+        )
+
+        response = self.assertBalance(1500, 0)
+        self.assertEqual(response.data["months"][0]["expenditure_count"], 0)
+
+    def test_balance_follows_bulk_operations(self):
+        """Batch creates, updates and deletes keep the rollup in step"""
+
+        created = self.client.post("/expenditure/user/bulk/", [
+            {
+                "category": "transport",
+                "name_of_item": "bus",
+                "estimated_amount": amount
+            }
+            for amount in [10, 20, 30]
+        ], format="json")
+        self.assertBalance(0, 60)
+
+        ids = [item["id"] for item in created.data]
+        self.client.patch("/expenditure/user/bulk/", {
+            "ids": ids[:2], "changes": {"estimated_amount": 100}
+        }, format="json")
+        self.assertBalance(0, 230)
+
+        self.client.delete(
+            "/expenditure/user/bulk/", {"ids": ids[1:]}, format="json"
+        )
+        self.assertBalance(0, 100)
+
+    def test_balance_reads_only_the_rollup(self):
+        """The balance never touches the income or expenditure tables"""
+
+        self.add_income(1000)
+        self.add_expense(300)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertBalance(1000, 300)
+
+        for query in queries:
+            self.assertNotIn("income_income", query["sql"])
+            self.assertNotIn("expenditure_expenditure", query["sql"])
+
+    def test_balance_is_scoped_to_user(self):
+        """Another user's records do not count"""
+
+        client2 = APIClient()
+        client2.force_authenticate(create_user(
+            email="test2@example.com", password="testpas123"
+        ))
+        client2.post(
+            "/income/user/", {"name_of_revenue": "salary", "amount": 100}
+        )
+
+        self.assertBalance(0, 0)
+
+    def test_rebuild_balances_command(self):
+        """The rebuild command recomputes drifted rollups"""
+
+        self.add_income(1000)
+        self.add_expense(300)
+        MonthlyBalance.objects.update(income_total=0, expenditure_count=9)
+
+        call_command("rebuild_balances", email=[self.user.email])
+
+        response = self.assertBalance(1000, 300)
+        self.assertEqual(response.data["months"][0]["expenditure_count"], 1)
+
+    def test_rebuild_locks_rollups_before_reading(self):
+        """Rebuilding reads the ledger only once the rollups are locked"""
+
+        self.add_income(1000)
+
+        with CaptureQueriesContext(connection) as queries:
+            MonthlyBalance.objects.rebuild([self.user.pk])
+
+        statements = [query["sql"] for query in queries]
+        lock = next(
+            index for index, sql in enumerate(statements)
+            if sql.startswith(("LOCK TABLE", "DELETE"))
+        )
+        first_read = next(
+            index for index, sql in enumerate(statements)
+            if "income_income" in sql
+        )
+        self.assertLess(lock, first_read)
+        self.assertBalance(1000, 0)
+
+    def test_balance_without_auth(self):
+        """The balance requires authentication"""
+
+        response = APIClient().get(BALANCE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SeedLedgerTests(TestCase):
+    """Synthetic data command Tests"""
+
+    def seed(self, **options):
+        call_command(
+            "seed_ledger", users=4, rows=120, seed=7, until="2026-01-01",
+            workers=1, stdout=StringIO(), **options
+        )
+        return sorted(
+            Expenditure.objects.values_list("id", flat=True)
+        ) + sorted(Income.objects.values_list("id", flat=True))
+
+    def test_seed_ledger_command(self):
+        """Users get the requested rows and matching balances"""
+
+        self.seed()
+
+        users = get_user_model().objects.filter(
+            email__endswith="@seed7.example.com"
+        )
+        self.assertEqual(users.count(), 4)
+        self.assertEqual(Income.objects.count() + Expenditure.objects.count(),
+                         120)
+        self.assertTrue(self.client.login(
+            email="user0@seed7.example.com", password="seedpassword123"
+        ))
+        seeded = sorted(MonthlyBalance.objects.values_list(
+            "user", "month", "income_total", "income_count",
+            "expenditure_total", "expenditure_count"
+        ))
+        MonthlyBalance.objects.rebuild()
+        self.assertEqual(seeded, sorted(MonthlyBalance.objects.values_list(
+            "user", "month", "income_total", "income_count",
+            "expenditure_total", "expenditure_count"
+        )))
+
+    def test_seed_ledger_is_deterministic(self):
+        """The same seed gives the same rows"""
+
+        first = self.seed()
+        second = self.seed(clear=True)
+
+        self.assertEqual(first, second)
+
+    def test_seed_ledger_twice_needs_clear(self):
+        """Loading a seed again is refused without --clear"""
+
+        self.seed()
+
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+class SearchAPITests(TestCase):
+    """Income and expenditure search Tests"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def add_expense(self, name, category="food", user=None):
+        user = user or self.user
+        return Expenditure.objects.create(
+            user=user, name_of_item=name, estimated_amount=100,
+            category=Category.objects.get_or_create(
+                user=user, name=category
+            )[0],
+        )
+
+    def add_income(self, name):
+        return Income.objects.create(
+            user=self.user, name_of_revenue=name, amount=100
+        )
+
+    def test_search_ranks_best_match_first(self):
+        """Whole values rank above prefixes, prefixes above substrings"""
+
+        substring = self.add_expense("Weekly groceries")
+        whole = self.add_income("Groceries")
+        prefix = self.add_expense("Groceries at the market")
+        self.add_expense("Rent")
+
+        response = self.client.get(SEARCH_URL, {"q": "groceries"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [row["id"] for row in results],
+            [str(whole.id), str(prefix.id), str(substring.id)],
+        )
+        self.assertEqual(results[0]["kind"], "income")
+        self.assertEqual(results[0]["score"], 1.0)
+        self.assertGreater(results[1]["score"], results[2]["score"])
+        self.assertIsNone(response.data["next"])
+
+    def test_search_matches_category(self):
+        """Expenditure is found by its category too"""
+
+        expense = self.add_expense("Bus ticket", category="transport")
+
+        response = self.client.get(
+            SEARCH_URL, {"q": "transport", "kind": "expenditure"}
+        )
+
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [str(expense.id)]
+        )
+
+    def test_search_is_scoped_to_user(self):
+        """Other users' records never match"""
+
+        other = create_user(email="other@example.com", password="pass12345")
+        self.add_expense("Coffee", user=other)
+
+        response = self.client.get(SEARCH_URL, {"q": "coffee"})
+
+        self.assertEqual(response.data["results"], [])
+
+    def test_search_pages_follow_the_cursor(self):
+        """Following ``next`` walks every match exactly once"""
+
+        expected = {str(self.add_expense(f"Taxi {i}").id) for i in range(5)}
+        expected |= {str(self.add_income(f"Taxi refund {i}").id)
+                     for i in range(2)}
+
+        seen = []
+        url, params = SEARCH_URL, {"q": "taxi", "page_size": 3}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            seen += [row["id"] for row in response.data["results"]]
+            url, params = response.data["next"], None
+
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+    def test_search_rejects_bad_parameters(self):
+        """A query is required and cursors must be ours"""
+
+        response = self.client.get(SEARCH_URL)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(SEARCH_URL, {"q": "x", "cursor": "nope"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_tolerates_typos(self):
+        """With pg_trgm a misspelled query still finds the record"""
+
+        if not trigram_available(connection):
+            self.skipTest("pg_trgm is not installed")
+        expense = self.add_expense("Electricity bill")
+
+        response = self.client.get(SEARCH_URL, {"q": "electrcity"})
+
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [str(expense.id)]
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+class PartitionTests(TestCase):
+    """Monthly partitions of the ledger tables Tests"""
+
+    table = "expenditure_expenditure"
+
+    def setUp(self) -> None:
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+        self.month = month_start(timezone.now())
+
+    def add_expense(self, date_created):
+        expense = Expenditure.objects.create(
+            user=self.user, name_of_item="item", estimated_amount=10,
+            category=Category.objects.get_or_create(
+                user=self.user, name="food"
+            )[0],
+        )
+        Expenditure.objects.filter(id=expense.id).update(
+            date_created=date_created
+        )
+        return expense
+
+    def partition_of(self, expense):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {self.table} "
+                f"WHERE id = %s", [expense.id]
+            )
+            return cursor.fetchone()[0]
+
+    def test_partition_ledger_creates_months_ahead(self):
+        """Every month up to ``ahead`` is covered, running twice is a no-op"""
+
+        out = StringIO()
+        call_command("partition_ledger", ahead=4, stdout=out)
+        call_command("partition_ledger", ahead=4, stdout=out)
+
+        ranges = partitions(connection, self.table)
+        self.assertEqual(ranges[0][0], f"{self.table}_legacy")
+        for (_, _, end), (_, start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+        self.assertEqual(ranges[-1][2], add_months(self.month, 5))
+        # The legacy partition covers this month and the next
+        self.assertEqual(out.getvalue().count(f"Created {self.table}_p"), 3)
+
+    def test_new_partition_takes_its_rows_from_default(self):
+        """Rows written before their month had a partition move into it"""
+
+        expense = self.add_expense(add_months(self.month, 8))
+        self.assertEqual(self.partition_of(expense), f"{self.table}_default")
+
+        maintain_partitions(connection, self.table, timezone.now(), ahead=8)
+
+        self.assertEqual(
+            self.partition_of(expense),
+            partition_name(self.table, add_months(self.month, 8)),
+        )
+        self.assertEqual(
+            Expenditure.objects.get(id=expense.id).name_of_item, "item"
+        )
+
+    def test_missed_months_get_their_partitions(self):
+        """Months skipped while maintenance did not run are created too"""
+
+        expense = self.add_expense(add_months(self.month, 5))
+
+        maintain_partitions(
+            connection, self.table, add_months(self.month, 8), ahead=0
+        )
+
+        self.assertEqual(
+            self.partition_of(expense),
+            partition_name(self.table, add_months(self.month, 5)),
+        )
+        ranges = partitions(connection, self.table)
+        for (_, _, end), (_, start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+        self.assertEqual(ranges[-1][2], add_months(self.month, 9))
+
+    def test_date_filters_prune_partitions(self):
+        """A query within one month only reads that month's partition"""
+
+        maintain_partitions(connection, self.table, timezone.now(), ahead=6)
+        month = add_months(self.month, 5)
+        self.add_expense(month)
+
+        plan = Expenditure.objects.filter(
+            user=self.user, date_created__gte=month,
+            date_created__lt=add_months(month, 1),
+        ).explain()
+
+        self.assertIn(partition_name(self.table, month), plan)
+        self.assertNotIn("_legacy", plan)
+        self.assertNotIn("_default", plan)
+
+    def test_old_partitions_are_detached(self):
+        """Partitions past the retention leave the table with their rows"""
+
+        later = add_months(self.month, 12)
+        maintain_partitions(connection, self.table, timezone.now(), ahead=6)
+        expense = self.add_expense(add_months(self.month, 4))
+
+        _, detached = maintain_partitions(
+            connection, self.table, later, ahead=0, retain=6
+        )
+
+        self.assertIn(f"{self.table}_legacy", detached)
+        self.assertIn(
+            partition_name(self.table, add_months(self.month, 4)), detached
+        )
+        self.assertNotIn(
+            partition_name(self.table, add_months(self.month, 6)), detached
+        )
+        self.assertFalse(Expenditure.objects.filter(id=expense.id).exists())
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+class PartitionRetentionTests(TransactionTestCase):
+    """Retention of the partition_ledger command in autocommit Tests"""
+
+    def setUp(self) -> None:
+        self.month = month_start(timezone.now())
+        self.before = {
+            table: partitions(connection, table)
+            for table in PARTITIONED_TABLES
+        }
+        self.addCleanup(self.restore_partitions)
+
+    def restore_partitions(self):
+        """Drop the partitions made by the test, attach the detached ones"""
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for table, before in self.before.items():
+                kept = {name for name, _, _ in before}
+                attached = {name for name, _, _ in partitions(
+                    connection, table
+                )}
+                for name in attached - kept:
+                    cursor.execute(
+                        f"ALTER TABLE {quote(table)} DETACH PARTITION "
+                        f"{quote(name)}"
+                    )
+                cursor.execute(
+                    "SELECT relname FROM pg_class WHERE relkind = 'r' "
+                    "AND relname LIKE %s", [f"{table}\\_p%"]
+                )
+                for (name,) in cursor.fetchall():
+                    if name not in kept:
+                        cursor.execute(f"DROP TABLE {quote(name)}")
+                for name, start, end in before:
+                    if name not in attached:
+                        cursor.execute(
+                            f"ALTER TABLE {quote(table)} ATTACH PARTITION "
+                            f"{quote(name)} FOR VALUES FROM "
+                            f"({'MINVALUE' if start is None else '%s'}) "
+                            f"TO (%s)", [*filter(None, [start]), end],
+                        )
+
+    def test_partition_ledger_detaches_next_to_default_partition(self):
+        """Retention works with the default partition outside a transaction"""
+
+        call_command("partition_ledger", stdout=StringIO())
+        out = StringIO()
+        with mock.patch(
+            "django.utils.timezone.now",
+            return_value=add_months(self.month, 14),
+        ):
+            call_command("partition_ledger", ahead=0, retain=6, stdout=out)
+
+        for table in PARTITIONED_TABLES:
+            self.assertIn(f"Detached {table}_legacy.", out.getvalue())
+            names = [name for name, _, _ in partitions(connection, table)]
+            self.assertNotIn(f"{table}_legacy", names)
+            self.assertIn(
+                partition_name(table, add_months(self.month, 14)), names
+            )
+
+
+class ArchiveTests(TestCase):
+    """Cold storage of old ledger rows Tests"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+        self.client.force_authenticate(self.user)
+        self.month = month_start(timezone.now())
+
+    def add_expense(self, name, amount, months_ago, category="food"):
+        """An expense created on the 10th of the month ``months_ago``"""
+        response = self.client.post(EXPENDITURE_URL, {
+            "category": category,
+            "name_of_item": name,
+            "estimated_amount": amount,
+        })
+        created = add_months(self.month, -months_ago).replace(day=10)
+        Expenditure.objects.filter(id=response.data["id"]).update(
+            date_created=created
+        )
+        return response.data["id"]
+
+    def list_names(self, **params):
+        names = []
+        url = EXPENDITURE_URL
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names.extend(
+                row["name_of_item"] for row in response.data["results"]
+            )
+            url, params = response.data["next"], None
+        return names
+
+    def archive(self, months=24, **options):
+        call_command(
+            "archive_ledger", older_than=months, stdout=StringIO(), **options
+        )
+
+    def test_archive_ledger_moves_old_rows(self):
+        """Old rows leave the table and decode back unchanged"""
+
+        ids = [
+            self.add_expense(f"old {n}", 10 + n, 30 + n % 2) for n in range(5)
+        ]
+        self.add_expense("recent", 7, 1)
+        before = {
+            row["id"]: row for row in Expenditure.objects.filter(
+                id__in=ids
+            ).values("id", "name_of_item", "estimated_amount", "date_created")
+        }
+
+        self.archive(batch_size=2)
+
+        self.assertEqual(Expenditure.objects.count(), 1)
+        self.assertEqual(ArchivedMonth.objects.count(), 2)
+        self.assertEqual(
+            sum(ArchivedMonth.objects.values_list("row_count", flat=True)), 5
+        )
+        rows = [
+            row for month in archived_rows(self.user, "expenditure")
+            for row in month
+        ]
+        self.assertEqual(len(rows), 5)
+        for row in rows:
+            self.assertEqual(row["category__name"], "food")
+            for name, value in before[row["id"]].items():
+                self.assertEqual(row[name], value)
+        self.assertEqual(
+            sum(ArchivedTotal.objects.values_list("total", flat=True)), 60
+        )
+
+    def test_archived_rows_stay_in_the_balance(self):
+        """Balances count archived rows, also once rebuilt"""
+
+        self.add_expense("old", 40, 30)
+        self.add_expense("recent", 2, 0)
+        self.archive()
+
+        call_command("rebuild_balances", stdout=StringIO())
+
+        response = self.client.get(BALANCE_URL)
+        self.assertEqual(response.data["expenditure_total"], 42)
+        self.assertEqual(
+            [month["expenditure_count"] for month in response.data["months"]],
+            [1, 1],
+        )
+
+    def test_list_reads_archived_rows_on_request(self):
+        """archived=true merges archived rows into the pages in order"""
+
+        for months_ago in (0, 26, 2, 30, 28, 40):
+            self.add_expense(f"{months_ago}", months_ago, months_ago)
+        etag = self.client.get(EXPENDITURE_URL)["ETag"]
+        self.archive()
+
+        self.assertEqual(self.list_names(page_size=2), ["0", "2"])
+        self.assertEqual(
+            self.list_names(page_size=2, archived="true"),
+            ["0", "2", "26", "28", "30", "40"],
+        )
+        self.assertEqual(
+            self.list_names(
+                page_size=4, archived="true", ordering="estimated_amount"
+            ),
+            ["0", "2", "26", "28", "30", "40"],
+        )
+        self.assertNotEqual(self.client.get(EXPENDITURE_URL)["ETag"], etag)
+
+    def test_archived_pages_start_at_the_cursor(self):
+        """A page only decodes the archived months from its cursor on"""
+
+        for months_ago in (26, 26, 28, 30, 32, 34, 36):
+            self.add_expense(f"{months_ago}", months_ago, months_ago)
+        self.archive()
+
+        for ordering in ("-date_created", "date_created"):
+            names, decoded = [], []
+            url, params = EXPENDITURE_URL, {
+                "page_size": 1, "archived": "true", "ordering": ordering,
+            }
+            while url:
+                with mock.patch(
+                    "ledger.archive.decode_rows", wraps=decode_rows
+                ) as decode:
+                    response = self.client.get(url, params)
+                names.extend(
+                    row["name_of_item"] for row in response.data["results"]
+                )
+                decoded.append(decode.call_count)
+                url, params = response.data["next"], None
+
+            expected = ["26", "26", "28", "30", "32", "34", "36"]
+            if ordering == "date_created":
+                expected.reverse()
+            self.assertEqual(names, expected)
+            # The cursor's month, two for the page and the one past it
+            self.assertLessEqual(max(decoded), 4)
+
+    def test_list_filters_apply_to_archived_rows(self):
+        """Archived rows go through the same list filters"""
+
+        self.add_expense("rent", 900, 30, category="home")
+        self.add_expense("bread", 3, 30)
+        self.add_expense("cake", 20, 31)
+        self.add_expense("fruit", 15, 1)
+        self.archive()
+        created_after = add_months(self.month, -31).replace(day=11)
+
+        self.assertEqual(
+            self.list_names(archived="true", category="food"),
+            ["fruit", "bread", "cake"],
+        )
+        self.assertEqual(
+            self.list_names(archived="true", estimated_amount_min=10),
+            ["fruit", "rent", "cake"],
+        )
+        self.assertEqual(
+            self.list_names(
+                archived="true", created_after=created_after.isoformat()
+            ),
+            ["fruit", "bread", "rent"],
+        )
+
+    def test_unpaginated_list_reads_archived_rows(self):
+        """Income has no paginator, archived rows join in list order"""
+
+        for months_ago, amount in ((30, 5), (0, 7), (28, 9)):
+            response = self.client.post(INCOME_URL, {
+                "name_of_revenue": f"{months_ago}", "amount": amount,
+            })
+            Income.objects.filter(id=response.data["id"]).update(
+                date_created=add_months(self.month, -months_ago)
+            )
+        self.archive()
+
+        response = self.client.get(INCOME_URL)
+        self.assertEqual(
+            [row["name_of_revenue"] for row in response.data], ["0"]
+        )
+        response = self.client.get(INCOME_URL, {"archived": "true"})
+        self.assertEqual(
+            [row["name_of_revenue"] for row in response.data],
+            ["0", "28", "30"],
+        )
+        self.assertEqual(
+            set(response.data[0]), {"id", "name_of_revenue", "amount"}
+        )
+        response = self.client.get(
+            INCOME_URL, {"archived": "true", "ordering": "-amount"}
+        )
+        self.assertEqual(
+            [row["amount"] for row in response.data], [9, 7, 5]
+        )
+
+    def test_series_adds_archived_totals(self):
+        """Series include the archived totals per bucket on request"""
+
+        self.add_expense("rent", 900, 30, category="home")
+        self.add_expense("bread", 3, 30)
+        self.add_expense("cake", 20, 30)
+        self.archive()
+        self.add_expense("more bread", 5, 30)
+
+        url = f"{EXPENDITURE_URL}series/"
+        response = self.client.get(url, {"group_by": "category"})
+        self.assertEqual(
+            [
+                (row["category"], row["total"])
+                for row in response.data["results"]
+            ],
+            [("food", 5)],
+        )
+
+        response = self.client.get(
+            url, {"group_by": "category", "archived": "true"}
+        )
+        self.assertEqual(
+            [
+                (row["category"], row["total"], row["count"])
+                for row in response.data["results"]
+            ],
+            [("food", 28, 3), ("home", 900, 1)],
+        )
+
+        response = self.client.get(
+            url, {"archived": "true", "tz": "Asia/Tokyo"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archive_before_merges_into_archived_months(self):
+        """Archiving a month twice keeps one archive row per month"""
+
+        self.add_expense("first", 1, 30)
+        cutoff = add_months(self.month, -24)
+        archive_before("expenditure", cutoff)
+        self.add_expense("second", 2, 30)
+        archive_before("expenditure", cutoff)
+
+        archived = ArchivedMonth.objects.get()
+        self.assertEqual(archived.row_count, 2)
+        self.assertEqual(ArchivedTotal.objects.get().count, 2)
@@ -0,0 +1,14 @@
+"""
+Urls for the Ledger API
+"""
+from django.urls import path
+
+from .views import BalanceAPIView, SearchAPIView
+
+
+app_name = "ledger"
+
+urlpatterns = [
+    path("balance/", BalanceAPIView.as_view(), name="balance"),
+    path("search/", SearchAPIView.as_view(), name="search"),
+]
@@ -0,0 +1,92 @@
+"""
+Views for the user's ledger
+"""
+from django.db import connections, router
+from django.db.models import F
+
+from rest_framework import generics
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from expensetracker.mixins import ReplicaReadMixin
+from expensetracker.timing import timed
+
+from . import search
+from .models import MonthlyBalance
+from .serializers import BalanceSerializer, SearchQuerySerializer
+
+
+class BalanceAPIView(ReplicaReadMixin, generics.GenericAPIView):
+    """Net balance of the user, read from the monthly rollups only"""
+    serializer_class = BalanceSerializer
+    permission_classes = [IsAuthenticated]
+    queryset = MonthlyBalance.objects.all()
+
+    def get_queryset(self):
+        """Override queryset to filter for user"""
+        return self.queryset.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        months = list(
+            self.get_queryset()
+            .annotate(balance=F("income_total") - F("expenditure_total"))
+            .order_by("month")
+        )
+        income_total = sum(month.income_total for month in months)
+        expenditure_total = sum(month.expenditure_total for month in months)
+        serializer = self.get_serializer({
+            "income_total": income_total,
+            "expenditure_total": expenditure_total,
+            "balance": income_total - expenditure_total,
+            "months": months,
+        })
+        return Response(serializer.data)
+
+
+class SearchAPIView(ReplicaReadMixin, generics.GenericAPIView):
+    """
+    Income and expenditure of the user whose names match ``q``, best match
+    first, paginated with a ``next`` cursor link. Uses pg_trgm word
+    similarity and its GIN indexes when the extension is installed,
+    case-insensitive substring matching otherwise.
+    """
+    permission_classes = [IsAuthenticated]
+    invalid_cursor_message = "Invalid cursor"
+
+    def get(self, request, *args, **kwargs):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        position = None
+        if "cursor" in params:
+            try:
+                position = search.decode_cursor(params["cursor"])
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+
+        kinds = [*search.SEARCH_TARGETS]
+        if "kind" in params:
+            kinds = [params["kind"]]
+        alias = router.db_for_read(search.SEARCH_TARGETS[kinds[0]][0])
+        rows, has_next = search.search(
+            request.user, params["q"], kinds, params["page_size"], position,
+            trigram=search.trigram_available(connections[alias]),
+        )
+
+        next_link = None
+        if has_next:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "cursor",
+                search.encode_cursor(rows[-1]),
+            )
+        with timed("serialize"):
+            results = [
+                {
+                    **row, "id": str(row["id"]),
+                    "score": row["score"] / search.SCORE_SCALE,
+                }
+                for row in rows
+            ]
+        return Response({"next": next_link, "results": results})
@@ -0,0 +1,128 @@
+"""
+Authentication backends for the user APIs
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from rest_framework import authentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from expensetracker.async_views import database_sync_to_async
+from expensetracker.timing import timed
+
+
+class UserCache:
+    """Thread-safe, size bounded LRU of user rows with a time to live"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        expires = time.monotonic() + settings.USER_CACHE_TTL
+        with self._lock:
+            self._entries[key] = (expires, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.USER_CACHE_MAX_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drop every entry of a user, whatever token it was cached for"""
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class TimedAuthenticationMixin:
+    """Add the time spent authenticating to the request timings"""
+
+    def authenticate(self, request):
+        with timed("auth"):
+            return super().authenticate(request)
+
+
+class CachedJWTAuthentication(TimedAuthenticationMixin, JWTAuthentication):
+    """
+    JWT authentication that skips the user ``SELECT`` on cache hits.
+
+    Users are cached per process, keyed by user id and the token's issue
+    time, and dropped whenever the user is saved or deleted. The TTL bounds
+    how long other processes may serve a stale row. Set
+    ``USER_CACHE_ENABLED = False`` to look the user up on every request.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.USER_CACHE_ENABLED:
+            return super().get_user(validated_token)
+
+        key = self.get_cache_key(validated_token)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        # Hand out a copy so a request can never alter the cached row
+        return copy.copy(user)
+
+    async def aauthenticate(self, request):
+        """``authenticate`` that only leaves the event loop on cache misses"""
+        with timed("auth"):
+            return await self._aauthenticate(request)
+
+    async def _aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if settings.USER_CACHE_ENABLED:
+            user = user_cache.get(self.get_cache_key(validated_token))
+            if user is not None:
+                return copy.copy(user), validated_token
+        user = await database_sync_to_async(self.get_user)(validated_token)
+        return user, validated_token
+
+    def get_cache_key(self, validated_token):
+        return (
+            str(validated_token.get(api_settings.USER_ID_CLAIM)),
+            validated_token.get("iat"),
+        )
+
+
+class TokenAuthentication(
+    TimedAuthenticationMixin, authentication.TokenAuthentication
+):
+    """DRF token authentication that async views can call"""
+
+    async def aauthenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            # Not a token header, nothing to look up
+            return None
+        return await database_sync_to_async(self.authenticate)(request)
@@ -0,0 +1,45 @@
+"""
+Benchmarks for the User's Endpoints
+"""
+from expensetracker.benchmarking import benchmark
+
+
+def signup_payload(context):
+    return {"data": {
+        "email": f"{context.unique('benchmark')}@example.com",
+        "password": "testpasswd123",
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "username": "benchmark",
+    }}
+
+
+@benchmark("user.signup", setup=signup_payload, iterations=10)
+def signup(context, data):
+    return context.client.post("/auth/signup/", data)
+
+
+@benchmark("user.login", iterations=10)
+def login(context):
+    return context.client.post("/auth/login/", {
+        "email": context.user.email, "password": context.password,
+    })
+
+
+@benchmark("user.token_refresh")
+def token_refresh(context):
+    return context.client.post(
+        "/auth/token/refresh/", {"refresh": context.refresh_token}
+    )
+
+
+@benchmark("user.profile")
+def profile(context):
+    return context.client.get(f"/auth/user/{context.user.id}/profile/")
+
+
+@benchmark("user.profile_update")
+def profile_update(context):
+    return context.client.put(
+        f"/auth/user/{context.user.id}/profile/", {"first_name": "Bench"}
+    )
@@ -0,0 +1,112 @@
+"""
+Refresh token blacklist lookups for the user APIs
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BlacklistCache:
+    """
+    Per process set of blacklisted refresh token ids.
+
+    The set is loaded on first use and then follows ``BlacklistedToken``
+    incrementally by primary key, at most once every
+    ``TOKEN_BLACKLIST_SYNC_INTERVAL`` seconds. Rows inserted out of id
+    order by concurrent transactions are picked up by a full reload every
+    ``TOKEN_BLACKLIST_RELOAD_INTERVAL`` seconds. Expired tokens are
+    dropped, so the set only holds tokens that could still be used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._expires = {}
+            self._last_id = 0
+            self._synced_at = None
+            self._loaded_at = None
+
+    def contains(self, jti):
+        """Whether ``jti`` may be blacklisted; ``False`` is authoritative"""
+        self.sync()
+        with self._lock:
+            return jti in self._expires
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._expires[jti] = expires_at
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            reload = force or self._loaded_at is None or (
+                now - self._loaded_at
+                >= settings.TOKEN_BLACKLIST_RELOAD_INTERVAL
+            )
+            if not reload and (
+                now - self._synced_at
+                < settings.TOKEN_BLACKLIST_SYNC_INTERVAL
+            ):
+                return
+            last_id = 0 if reload else self._last_id
+
+        rows = list(
+            BlacklistedToken.objects
+            .filter(id__gt=last_id, token__expires_at__gt=timezone.now())
+            .order_by("id")
+            .values_list("id", "token__jti", "token__expires_at")
+        )
+
+        with self._lock:
+            expires = {} if reload else self._expires
+            for pk, jti, expires_at in rows:
+                expires[jti] = expires_at
+                last_id = max(last_id, pk)
+            if reload:
+                # Keep tokens blacklisted by this process during the load
+                for jti, expires_at in self._expires.items():
+                    expires.setdefault(jti, expires_at)
+                self._loaded_at = now
+            cutoff = timezone.now()
+            self._expires = {
+                jti: expires_at for jti, expires_at in expires.items()
+                if expires_at > cutoff
+            }
+            self._last_id = max(self._last_id, last_id)
+            self._synced_at = now
+
+
+blacklist_cache = BlacklistCache()
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    Refresh token checking ``blacklist_cache`` before the database.
+
+    Tokens missing from the cache are accepted without a query; a hit is
+    confirmed against ``BlacklistedToken``. Tokens blacklisted in another
+    process are usually rejected within ``TOKEN_BLACKLIST_SYNC_INTERVAL``
+    seconds, but one committed out of id order is only seen by the next
+    full reload: it may be accepted for up to
+    ``TOKEN_BLACKLIST_RELOAD_INTERVAL`` seconds.
+    """
+
+    def check_blacklist(self):
+        if blacklist_cache.contains(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted, created = super().blacklist()
+        blacklist_cache.add(
+            blacklisted.token.jti, blacklisted.token.expires_at
+        )
+        return blacklisted, created
@@ -0,0 +1,75 @@
+"""
+Password hashing off the request thread
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    check_password, get_hasher, identify_hasher, make_password
+)
+
+
+class PoolSaturated(Exception):
+    """Raised when too many hashing jobs are already waiting"""
+
+
+def verify_password(password, encoded):
+    """
+    Check ``password`` against ``encoded`` and return ``(valid, rehashed)``.
+
+    ``rehashed`` is a new encoding with the preferred hasher (the first of
+    ``PASSWORD_HASHERS``) when the stored one is outdated, else ``None``.
+    """
+    if not check_password(password, encoded):
+        return False, None
+    preferred = get_hasher("default")
+    if (
+        identify_hasher(encoded).algorithm != preferred.algorithm
+        or preferred.must_update(encoded)
+    ):
+        return True, make_password(password)
+    return True, None
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for password hashing.
+
+    PBKDF2 and Argon2 release the GIL while hashing, so a few threads keep
+    several cores busy while the event loop keeps serving other requests.
+    Once ``LOGIN_HASH_QUEUE_LIMIT`` jobs are running or queued, new jobs
+    are refused instead of piling up behind a login burst.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.LOGIN_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+            return self._executor
+
+    async def run(self, func, *args):
+        executor = self.executor
+        with self._lock:
+            if self._pending >= settings.LOGIN_HASH_QUEUE_LIMIT:
+                raise PoolSaturated
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+hash_pool = PasswordHashPool()
@@ -0,0 +1,57 @@
+"""
+Delete expired refresh tokens from the blacklist tables in small batches
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted refresh tokens in short "
+        "batches so no table is locked for long. Meant to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Rows deleted per transaction (default 1000).",
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=0.0,
+            help="Seconds to pause between batches (default 0).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        cutoff = timezone.now()
+        expired = (
+            OutstandingToken.objects
+            .filter(expires_at__lte=cutoff)
+            .order_by("id")
+        )
+
+        deleted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                expired.filter(id__gt=last_id)
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                # Cascades to the blacklist rows of the same tokens
+                OutstandingToken.objects.filter(id__in=ids).only("id").delete()
+            deleted += len(ids)
+            last_id = ids[-1]
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} expired token(s)."
+        ))
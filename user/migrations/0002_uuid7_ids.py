@@ -0,0 +1,26 @@
+# Generated by Django 4.1.4 on 2026-10-18 12:32
+
+from django.db import migrations, models
+import expensetracker.uuids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="id",
+            field=models.UUIDField(
+                db_index=True,
+                default=expensetracker.uuids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+                unique=True,
+            ),
+        ),
+    ]
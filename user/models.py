@@ -1,7 +1,6 @@
 """
 Models for the User
 """
-from uuid import uuid4
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -9,6 +8,8 @@ from django.contrib.auth.models import (
     BaseUserManager
 )
 
+from expensetracker.uuids import uuid7
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -39,7 +40,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     id = models.UUIDField(
         primary_key=True,
         unique=True, db_index=True,
-        default=uuid4, editable=False
+        default=uuid7, editable=False
     )
     email = models.EmailField(max_length=255, unique=True)
     first_name = models.CharField(max_length=255)
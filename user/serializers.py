@@ -6,9 +6,14 @@ from django.contrib.auth import (
 )
 
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 
+from expensetracker.timing import TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+from .blacklist import CachedRefreshToken
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
 
     class Meta:
@@ -50,3 +55,8 @@ class AuthTokenSerializer(serializers.Serializer):
 class LogoutSerializer(serializers.Serializer):
     """Serializer class for logout allow for a field"""
     refresh = serializers.CharField()
+
+
+class RefreshSerializer(TokenRefreshSerializer):
+    """Token refresh checking the cached blacklist"""
+    token_class = CachedRefreshToken
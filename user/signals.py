@@ -0,0 +1,15 @@
+"""
+Signal handlers for the user app
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Forget the cached row when a user is changed or removed"""
+    user_cache.invalidate(instance.pk)
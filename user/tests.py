@@ -1,19 +1,33 @@
 """
 Test cases for User APIs
 """
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken
+)
 
+from user.authentication import user_cache
+from user.blacklist import CachedRefreshToken, blacklist_cache
 from user.models import User
 
 
 SIGNUP_URL = reverse("auth:signup")
 LOGIN_URL = reverse("auth:login")
 LOGOUT_URL = reverse("auth:logout")
+ASYNC_LOGIN_URL = reverse("auth:login-async")
+REFRESH_URL = reverse("auth:token-refresh")
 
 
 def create_user(**params):
@@ -293,4 +307,246 @@ class UserAPITests(TestCase):
             )
 
 
+class CachedJWTAuthenticationTests(TestCase):
+    """Authenticated-user cache Tests"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+        response = self.client.post(LOGIN_URL, {
+            "email": "test@example.com",
+            "password": "testpasswd123"
+        })
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer {}".format(
+                response.data["tokens"]["access_token"]
+            )
+        )
+
+    def user_queries(self):
+        """Run an authenticated request and return its user lookups"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/income/user/")
+        return response, [
+            query for query in queries
+            if 'FROM "user_user"' in query["sql"]
+        ]
+
+    def test_user_is_cached_between_requests(self):
+        """Only the first request looks the user up"""
+
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
+
+    def test_deactivated_user_is_rejected(self):
+        """Saving the user drops the cached row"""
+
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_invalidates_cache(self):
+        """Updating the profile refreshes the cached user"""
+
+        self.user_queries()
+        self.client.put(
+            reverse("auth:user-profile", args=[self.user.id]),
+            {"first_name": "tester"}
+        )
+
+        response, queries = self.user_queries()
+        self.assertEqual(len(queries), 1)
+
+    @override_settings(USER_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        """With the cache disabled every request looks the user up"""
+
+        self.user_queries()
+        response, queries = self.user_queries()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+
+    @override_settings(USER_CACHE_MAX_SIZE=1)
+    def test_cache_is_bounded(self):
+        """The least recently used entries are evicted"""
+
+        user_cache.set(("someone", 1), self.user)
+        user_cache.set(("someone-else", 1), self.user)
+
+        self.assertIsNone(user_cache.get(("someone", 1)))
+        self.assertIsNotNone(user_cache.get(("someone-else", 1)))
+
+
+class AsyncLoginTests(TestCase):
+    """Async login Tests"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+
+    def test_async_login_for_token(self):
+        """The async login returns the same payload as the sync one"""
+
+        response = self.client.post(ASYNC_LOGIN_URL, {
+            "email": "test@example.com",
+            "password": "testpasswd123"
+        }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["id"], str(self.user.id))
+        self.assertEqual(data["email"], "test@example.com")
+        self.assertIn("access_token", data["tokens"])
+        self.assertIn("refresh_token", data["tokens"])
+
+    def test_async_login_wrong_credentials(self):
+        """Wrong passwords and unknown emails are both rejected"""
+
+        for payload in [
+            {"email": "test@example.com", "password": "password"},
+            {"email": "nobody@example.com", "password": "testpasswd123"},
+            {"email": "test@example.com"},
+        ]:
+            response = self.client.post(ASYNC_LOGIN_URL, payload)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+            self.assertNotIn("tokens", response.json())
+
+    def test_async_login_inactive_user(self):
+        """Inactive users cannot log in"""
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.post(ASYNC_LOGIN_URL, {
+            "email": "test@example.com",
+            "password": "testpasswd123"
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(LOGIN_HASH_QUEUE_LIMIT=0)
+    def test_async_login_when_pool_is_saturated(self):
+        """Logins beyond the queue limit are refused with a 503"""
+
+        response = self.client.post(ASYNC_LOGIN_URL, {
+            "email": "test@example.com",
+            "password": "testpasswd123"
+        })
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertIn("Retry-After", response)
+
+    def test_async_login_rehashes_to_preferred_hasher(self):
+        """A successful login upgrades the stored hash"""
+
+        hashers = [
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        ]
+        with override_settings(PASSWORD_HASHERS=hashers):
+            response = self.client.post(ASYNC_LOGIN_URL, {
+                "email": "test@example.com",
+                "password": "testpasswd123"
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
+
+
+class RefreshTokenBlacklistTests(TestCase):
+    """Cached refresh token blacklist Tests"""
+
+    def setUp(self):
+        blacklist_cache.reset()
+        self.client = APIClient()
+        self.user = create_user(
+            email="test@example.com", password="testpasswd123"
+        )
+
+    def login(self):
+        response = self.client.post(LOGIN_URL, {
+            "email": "test@example.com",
+            "password": "testpasswd123"
+        })
+        return response.data["tokens"]["refresh_token"]
+
+    def test_refresh_token(self):
+        """A valid refresh token is exchanged for an access token"""
+        response = self.client.post(REFRESH_URL, {"refresh": self.login()})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.data)
+
+    def test_logged_out_token_cannot_refresh(self):
+        """Logging out blacklists the refresh token"""
+        refresh = self.login()
+        self.client.post(LOGOUT_URL, {"refresh": refresh})
+
+        response = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(LOGOUT_URL, {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unlisted_token_skips_blacklist_query(self):
+        """Tokens missing from the cache are not looked up"""
+        refresh = self.login()
+        blacklist_cache.sync(force=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            CachedRefreshToken(refresh)
+
+        self.assertEqual(len(queries), 0)
+
+    def test_blacklist_from_other_process_is_synced(self):
+        """Blacklist rows written elsewhere are picked up on sync"""
+        refresh = self.login()
+        blacklist_cache.sync(force=True)
+        token = OutstandingToken.objects.get(token=refresh)
+        BlacklistedToken.objects.create(token=token)
+
+        blacklist_cache.sync(force=True)
+
+        self.assertTrue(blacklist_cache.contains(token.jti))
+        response = self.client.post(REFRESH_URL, {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_compact_tokens_deletes_expired_tokens(self):
+        """Only expired tokens and their blacklist rows are deleted"""
+        live = CachedRefreshToken.for_user(self.user)
+        live.blacklist()
+        for _ in range(3):
+            CachedRefreshToken.for_user(self.user).blacklist()
+        OutstandingToken.objects.exclude(jti=live["jti"]).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        call_command("compact_tokens", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)),
+            [live["jti"]],
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
 # Create your tests here.
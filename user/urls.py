@@ -4,8 +4,8 @@ Urls for User APIs
 from django.urls import path
 
 from .views import (
-    CreateUserView, LoginUserView, LogoutUserView,
-    UserUpdateGetView
+    AsyncLoginView, CreateUserView, LoginUserView, LogoutUserView,
+    RefreshTokenView, UserUpdateGetView
 )
 
 app_name = "auth"
@@ -14,7 +14,9 @@ app_name = "auth"
 urlpatterns = [
     path("signup/", CreateUserView.as_view(), name='signup'),
     path("login/", LoginUserView.as_view(), name='login'),
+    path("login/async/", AsyncLoginView.as_view(), name="login-async"),
     path("logout/", LogoutUserView.as_view(), name="logout"),
+    path("token/refresh/", RefreshTokenView.as_view(), name="token-refresh"),
     path(
         "user/<uuid:pk>/profile/",
         UserUpdateGetView.as_view(),
@@ -2,22 +2,37 @@
 API Views for the user
 """
 # from django.shortcuts import render
+import json
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView, TokenRefreshView
+)
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 
+from expensetracker import metrics
+from expensetracker.mixins import ReplicaReadMixin
+
+from .blacklist import CachedRefreshToken
+from .hashing import PoolSaturated, hash_pool, verify_password
 from .models import User
 
 from .serializers import (
     AuthTokenSerializer, UserSerializer,
-    LogoutSerializer
+    LogoutSerializer, RefreshSerializer
 )
 
 
@@ -26,7 +41,7 @@ class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class UserUpdateGetView(generics.RetrieveUpdateAPIView):
+class UserUpdateGetView(ReplicaReadMixin, generics.RetrieveUpdateAPIView):
     """get user profile and update"""
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -78,11 +93,88 @@ class LoginUserView(TokenObtainPairView):
                     "access_token": str(refresh.access_token),
                 }
             }, status=status.HTTP_200_OK)
+        metrics.record_auth_failure(
+            metrics.route_of(request), "invalid_credentials"
+        )
         return Response({
             "error": "Invalid Username/Password"
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncLoginView(View):
+    """
+    ASGI native login returning the same payload as LoginUserView.
+
+    Password hashing runs in the bounded ``hash_pool`` so the event loop
+    keeps serving other requests during a login burst; when the pool is
+    saturated the login is refused with a 503.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        data = self.get_data(request)
+        email = data.get("email")
+        password = data.get("password")
+        if not isinstance(email, str) or not isinstance(password, str):
+            return self.invalid_credentials()
+
+        try:
+            user = await self.authenticate(email, password)
+        except PoolSaturated:
+            response = JsonResponse({
+                "error": "Too many concurrent logins, retry shortly"
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response.headers["Retry-After"] = "1"
+            return response
+        if user is None:
+            return self.invalid_credentials()
+
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
+        return JsonResponse({
+            "id": str(user.id),
+            "email": email,
+            "tokens": {
+                "refresh_token": str(refresh),
+                "access_token": str(refresh.access_token),
+            }
+        }, status=status.HTTP_200_OK)
+
+    async def authenticate(self, email, password):
+        """Mirror ModelBackend.authenticate with hashing in the pool"""
+        try:
+            user = await User.objects.aget(email=email)
+        except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as known ones
+            await hash_pool.run(make_password, password)
+            return None
+
+        valid, rehashed = await hash_pool.run(
+            verify_password, password, user.password
+        )
+        if not valid or not user.is_active:
+            return None
+        if rehashed:
+            await User.objects.filter(pk=user.pk).aupdate(password=rehashed)
+        return user
+
+    def get_data(self, request):
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body)
+            except ValueError:
+                return {}
+            return data if isinstance(data, dict) else {}
+        return request.POST
+
+    def invalid_credentials(self):
+        metrics.record_auth_failure(
+            metrics.route_of(self.request), "invalid_credentials"
+        )
+        return JsonResponse({
+            "error": "Invalid Username/Password"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
 class LogoutUserView(APIView):
     """Logout View for user tokens"""
     # permission_classes = [IsAuthenticated]
@@ -91,7 +183,7 @@ class LogoutUserView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             # access_token = token.access_token
             # print(access_token)
             if token:
@@ -110,4 +202,9 @@ class LogoutUserView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RefreshTokenView(TokenRefreshView):
+    """Exchange a refresh token that is not blacklisted for an access token"""
+    serializer_class = RefreshSerializer
+
+
 # Create your views here.